@@ -14,6 +14,9 @@ accounts_bp = Blueprint('accounts', __name__)
 # Initialize account manager
 account_manager = AccountManager()
 
+# Seconds a link check over all accounts may run on the event loop before it is cancelled
+LINK_CHECK_TIMEOUT = 600
+
 @accounts_bp.route('/accounts')
 def accounts():
     """View and manage Telegram user accounts"""
@@ -332,9 +335,13 @@ def verify_2fa():
 def check_accounts_for_links():
     """Check all connected accounts for links"""
     try:
-        from link_manager import link_manager  # Import here to avoid circular imports
         from logger import logger
         
+        # The app's LinkManager, wired in by main.py
+        link_manager = account_manager.link_manager
+        if link_manager is None:
+            raise RuntimeError("Link manager not configured for accounts")
+        
         logger.critical("[CHECK_ACCOUNTS_DEBUG] Starting manual check for links in all accounts")
         
         # Get max messages count from settings or use default
@@ -360,7 +367,8 @@ def check_accounts_for_links():
                 "accounts_checked": 0,
                 "accounts_with_links": 0,
                 "account_results": {}
-            }
+            },
+            timeout=LINK_CHECK_TIMEOUT
         )
         
         # Log the results
@@ -394,6 +402,22 @@ def check_accounts_for_links():
             "account_results": {}
         })
 
+@accounts_bp.route('/set_account_streaming', methods=['POST'])
+def set_account_streaming():
+    """Turn live link capture from group messages on or off for an account"""
+    try:
+        data = request.json
+        phone = data.get('phone')
+        
+        if not phone:
+            return jsonify({"success": False, "message": "شماره تلفن نامعتبر"})
+        
+        success, message = account_manager.set_account_streaming(phone, bool(data.get('enabled')))
+        return jsonify({"success": success, "message": message})
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": f"خطا در تغییر حالت دریافت زنده: {str(e)}"})
+
 @accounts_bp.route('/private_messages')
 def private_messages():
     """View private messages received by Telegram user accounts"""
@@ -603,9 +627,11 @@ def clear_chat_history():
 # Add a scheduled task to check accounts periodically
 def setup_account_scheduler(scheduler):
     """Configure scheduler for automatic account checking"""
-    from link_manager import link_manager  # Import here to avoid circular imports
     import logging
     
+    # The app's LinkManager, wired in by main.py
+    link_manager = account_manager.link_manager
+    
     logger = logging.getLogger("account_scheduler")
     logger.critical("[ACCOUNT_SCHEDULER_DEBUG] Setting up account scheduler with auto-connect")
     
@@ -620,19 +646,22 @@ def setup_account_scheduler(scheduler):
         if len(all_accounts) > len(active_accounts):
             logger.critical("[ACCOUNT_SCHEDULER_DEBUG] Auto-connecting accounts on startup...")
             
-            # For each account that needs connection
-            for account in all_accounts:
-                if not account.connected and account.status != "active":
-                    logger.critical(f"[ACCOUNT_SCHEDULER_DEBUG] Auto-connecting account: {account.phone}")
-                    
-                    # Try to connect the account
-                    connect_result = safe_run_coroutine(account.connect(), (False, "Error connecting"))
-                    logger.critical(f"[ACCOUNT_SCHEDULER_DEBUG] Connect result for {account.phone}: {connect_result}")
-                    
-                    if account.connected:
-                        # Check for registered event handlers
-                        handlers_result = safe_run_coroutine(account.check_handlers(), {"success": False, "handlers": 0})
-                        logger.critical(f"[ACCOUNT_SCHEDULER_DEBUG] Handlers check for {account.phone}: {handlers_result}")
+            # Connect every account that needs it, side by side
+            to_connect = [account for account in all_accounts
+                          if not account.connected and account.status != "active"]
+            connect_results = safe_run_coroutine(
+                account_manager.connect_accounts(to_connect),
+                {},
+                timeout=account_manager.connect_all_timeout(len(to_connect))
+            )
+            
+            for account in to_connect:
+                logger.critical(f"[ACCOUNT_SCHEDULER_DEBUG] Connect result for {account.phone}: {connect_results.get(account.phone)}")
+                
+                if account.connected:
+                    # Check for registered event handlers
+                    handlers_result = safe_run_coroutine(account.check_handlers(), {"success": False, "handlers": 0})
+                    logger.critical(f"[ACCOUNT_SCHEDULER_DEBUG] Handlers check for {account.phone}: {handlers_result}")
             
             # Save account states
             account_manager.save_accounts()
@@ -665,7 +694,8 @@ def setup_account_scheduler(scheduler):
                     "accounts_checked": 0,
                     "accounts_with_links": 0,
                     "account_results": {}
-                }
+                },
+                timeout=LINK_CHECK_TIMEOUT
             )
             
             # Log the results
@@ -0,0 +1,275 @@
+"""
+Asyncio Telegram Bot API client used for receiving private messages.
+
+A single long-poll task reads updates from getUpdates and puts them on a
+bounded queue; a fixed number of worker tasks take updates off the queue and
+handle them. The AI reply is generated in a thread pool (the AI clients are
+synchronous), so a slow reply only occupies one worker while polling and the
+other workers keep going. When the queue is full the poll task waits, which
+holds back getUpdates instead of buffering without limit.
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logger import get_logger
+from bot import generate_private_reply, log_private_message
+
+# Get module logger
+logger = get_logger(__name__)
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+
+class AsyncTelegramBot:
+    """Telegram bot with a long-poll task and a bounded pool of update handlers"""
+
+    def __init__(self, token, poll_timeout=30, queue_size=100, max_workers=4, max_concurrent_sends=8,
+                 private_message_handlers=None):
+        """
+        Initialize the bot
+
+        Args:
+            token (str): The bot token
+            poll_timeout (int): Seconds getUpdates waits for new updates (long polling)
+            queue_size (int): Updates that may wait for a worker before polling pauses
+            max_workers (int): Updates handled at the same time, and threads for AI replies
+            max_concurrent_sends (int): sendMessage requests in flight at the same time
+            private_message_handlers (list, optional): Extra handlers called with each private
+                message; plain functions run in the thread pool, coroutine functions are awaited
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for AsyncTelegramBot")
+
+        self.token = token
+        self.api_base_url = f"https://api.telegram.org/bot{token}/"
+        self.last_update_id = 0
+        self.private_message_handlers = private_message_handlers if private_message_handlers is not None else []
+
+        self.poll_timeout = poll_timeout
+        self.queue_size = queue_size
+        self.max_workers = max_workers
+        self.max_concurrent_sends = max_concurrent_sends
+        self.stats = {'received': 0, 'handled': 0, 'failed': 0}
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bot-handler")
+        self._session = None
+        self._queue = None
+        self._send_semaphore = None
+        self._chat_locks = {}    # Chat id to (lock, number of updates holding or waiting for it)
+        self._loop = None
+        self._poll_task = None
+        self._thread = None
+
+    async def request(self, method, params=None, timeout=30):
+        """
+        Make a request to the Telegram API
+
+        Args:
+            method (str): API method name
+            params (dict, optional): Method parameters
+            timeout (int): Request timeout in seconds
+
+        Returns:
+            dict: The API response, or {"ok": False, ...} if every attempt failed
+        """
+        url = self.api_base_url + method
+        max_retries = 3
+        retry_delay = 1  # seconds
+
+        for attempt in range(max_retries):
+            try:
+                async with self._session.post(url, data=params or {},
+                                              timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    result = await response.json(content_type=None)
+
+                # Flood control: wait as long as Telegram asks and try again
+                if response.status == 429 and attempt < max_retries - 1:
+                    retry_after = result.get('parameters', {}).get('retry_after', retry_delay)
+                    logger.warning(f"Rate limited on {method}, retrying in {retry_after}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+
+                # Telegram reports API errors (e.g. chat not found) in the JSON body
+                return result
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.warning(f"Request failed (attempt {attempt+1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                else:
+                    logger.error(f"Max retries reached for {method}")
+                    return {"ok": False, "description": f"Request failed after {max_retries} attempts: {str(e)}"}
+
+        return {"ok": False, "description": "Rate limited"}
+
+    async def get_updates(self, offset=None, timeout=30):
+        """Get updates from Telegram API, waiting up to timeout seconds for new ones"""
+        params = {'timeout': timeout}
+        if offset:
+            params['offset'] = offset
+        # Leave the server time to answer an empty long poll before giving up
+        return await self.request('getUpdates', params, timeout=timeout + 10)
+
+    async def get_chat(self, chat_id):
+        """Get information about a chat"""
+        return await self.request('getChat', {'chat_id': chat_id})
+
+    async def send_message(self, chat_id, text):
+        """Send a message to a chat"""
+        async with self._send_semaphore:
+            return await self.request('sendMessage', {'chat_id': chat_id, 'text': text})
+
+    async def run(self):
+        """Poll for updates and handle them until stop() is called"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._send_semaphore = asyncio.Semaphore(self.max_concurrent_sends)
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_concurrent_sends + 2))
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+        self._poll_task = asyncio.create_task(self._poll_loop())
+        logger.info(f"Async bot polling started with {self.max_workers} workers")
+
+        try:
+            await self._poll_task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self._session.close()
+            logger.info(f"Async bot polling stopped: {self.stats}")
+
+    def start_in_thread(self):
+        """
+        Run the bot on its own event loop in a daemon thread
+
+        Returns:
+            threading.Thread: The thread running the bot
+        """
+        def runner():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.run())
+            except Exception as e:
+                logger.error(f"Async bot stopped with an error: {str(e)}")
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=runner, name="async-bot", daemon=True)
+        self._thread.start()
+        logger.critical("[BOT_DEBUG] Async update polling thread started")
+        return self._thread
+
+    def stop(self):
+        """Stop polling; updates already queued are dropped"""
+        if self._loop and self._poll_task and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._poll_task.cancel)
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self):
+        """
+        Get update counters
+
+        Returns:
+            dict: Updates received, handled and failed, and how many are waiting in the queue
+        """
+        stats = dict(self.stats)
+        stats['queued'] = self._queue.qsize() if self._queue else 0
+        return stats
+
+    async def _poll_loop(self):
+        """Long-poll getUpdates and queue every update"""
+        while True:
+            try:
+                result = await self.get_updates(offset=self.last_update_id + 1, timeout=self.poll_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.critical(f"[BOT_DEBUG] Error polling for updates: {str(e)}")
+                await asyncio.sleep(5)
+                continue
+
+            if not result.get('ok'):
+                # Back off a little when the poll itself failed
+                logger.warning(f"getUpdates failed: {result.get('description')}")
+                await asyncio.sleep(1)
+                continue
+
+            updates = result.get('result', [])
+            if updates:
+                logger.critical(f"[BOT_DEBUG] Received {len(updates)} updates")
+
+            for update in updates:
+                if update['update_id'] > self.last_update_id:
+                    self.last_update_id = update['update_id']
+                self.stats['received'] += 1
+                # Blocks while the queue is full, so polling waits for the workers
+                await self._queue.put(update)
+
+    async def _worker(self):
+        """Take updates off the queue and handle them one at a time"""
+        while True:
+            update = await self._queue.get()
+            try:
+                await self._handle_update(update)
+                self.stats['handled'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.critical(f"[BOT_DEBUG] Error handling update {update.get('update_id')}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _handle_update(self, update):
+        """Handle one update; only private messages are acted on"""
+        try:
+            logger.critical(f"[BOT_DEBUG] Received update: {json.dumps(update, ensure_ascii=False)[:1000]}")
+        except Exception as log_err:
+            logger.critical(f"[BOT_DEBUG] Error logging update: {str(log_err)}")
+
+        message = update.get('message')
+        if not message or message.get('chat', {}).get('type') != 'private':
+            return
+
+        logger.critical(f"[BOT_DEBUG] Received private message from user {message.get('from', {}).get('id')}: {message.get('text', '')[:100]}")
+
+        # Messages from the same chat are answered in order; other chats are not held up
+        chat_id = message['chat']['id']
+        lock, pending = self._chat_locks.get(chat_id, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._chat_locks[chat_id] = (lock, pending + 1)
+
+        try:
+            async with lock:
+                loop = asyncio.get_running_loop()
+
+                # The AI clients block, so the reply is generated in the thread pool
+                reply_chat_id, reply = await loop.run_in_executor(self._executor, generate_private_reply, message)
+                if reply:
+                    logger.critical(f"[BOT_DIRECT_DEBUG] Sending AI response: {reply[:50]}...")
+                    await self.send_message(reply_chat_id, reply)
+
+                # Always save message to chat history to ensure it appears in the admin panel
+                await loop.run_in_executor(self._executor, log_private_message, message)
+
+                for handler in self.private_message_handlers:
+                    if asyncio.iscoroutinefunction(handler):
+                        await handler(message)
+                    else:
+                        await loop.run_in_executor(self._executor, handler, message)
+        finally:
+            lock, pending = self._chat_locks[chat_id]
+            if pending <= 1:
+                del self._chat_locks[chat_id]
+            else:
+                self._chat_locks[chat_id] = (lock, pending - 1)
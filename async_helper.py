@@ -1,86 +1,148 @@
 import asyncio
+import concurrent.futures
 import functools
 import logging
+import threading
 import traceback
 from threading import Lock
 
 logger = logging.getLogger(__name__)
 
-# Global event loop for asyncio operations
+# Seconds a blocking caller waits for a coroutine before giving up on it
+DEFAULT_TIMEOUT = 120
+
+# Global event loop for asyncio operations, run forever by a background thread
 _event_loop = None
+_loop_thread = None
 _loop_lock = Lock()
 
+
+def _run_loop(loop, ready):
+    """Body of the loop thread: run the loop until the process exits"""
+    asyncio.set_event_loop(loop)
+    loop.call_soon(ready.set)
+    try:
+        loop.run_forever()
+    finally:
+        logger.critical("[ASYNC_HELPER_DEBUG] Event loop thread stopped")
+
+
 def get_event_loop():
     """
-    Returns a singleton event loop for all asyncio operations
-    
-    This ensures we're using the same event loop across the application
-    which helps prevent the "event loop changed" errors with Telethon
+    Returns the singleton event loop for all asyncio operations
+
+    The loop runs forever in a dedicated daemon thread, so the Telethon clients
+    created on it keep receiving updates between calls, and callers from other
+    threads only wait for their own coroutine instead of driving the loop.
     """
-    global _event_loop
-    
+    global _event_loop, _loop_thread
+
     with _loop_lock:
-        if _event_loop is None or _event_loop.is_closed():
-            logger.critical("[ASYNC_HELPER_DEBUG] Creating new event loop")
-            _event_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(_event_loop)
-            logger.critical(f"[ASYNC_HELPER_DEBUG] Successfully created new event loop: {_event_loop}")
-        
-        # Make sure the loop is still running
-        if _event_loop.is_closed():
-            logger.critical("[ASYNC_HELPER_DEBUG] Event loop was closed! Creating a new one.")
+        if _event_loop is None or _event_loop.is_closed() or not _loop_thread.is_alive():
+            logger.critical("[ASYNC_HELPER_DEBUG] Starting event loop thread")
             _event_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(_event_loop)
-        
+            ready = threading.Event()
+            _loop_thread = threading.Thread(target=_run_loop, args=(_event_loop, ready),
+                                            name="asyncio-loop", daemon=True)
+            _loop_thread.start()
+            ready.wait()
+            logger.critical(f"[ASYNC_HELPER_DEBUG] Event loop running: {_event_loop}")
+
         return _event_loop
 
+
+def in_loop_thread():
+    """Whether the caller is running on the event loop thread"""
+    return _loop_thread is not None and threading.current_thread() is _loop_thread
+
+
+def submit(coro):
+    """
+    Schedule a coroutine on the background event loop without waiting for it
+
+    Args:
+        coro: The coroutine to run
+
+    Returns:
+        concurrent.futures.Future: Resolves to the coroutine's result; cancelling
+            it cancels the coroutine
+    """
+    loop = get_event_loop()
+    logger.debug(f"[ASYNC_HELPER_DEBUG] Submitting {getattr(coro, '__qualname__', coro)}")
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def run_coroutine(coro, timeout=DEFAULT_TIMEOUT):
+    """
+    Run a coroutine on the background event loop and wait for its result
+
+    Args:
+        coro: The coroutine to run
+        timeout (float): Seconds to wait; on timeout the coroutine is cancelled
+
+    Returns:
+        The result of the coroutine
+
+    Raises:
+        concurrent.futures.TimeoutError: If the coroutine did not finish in time
+        RuntimeError: If called from the loop thread itself, where waiting would deadlock
+    """
+    if in_loop_thread():
+        coro.close()
+        raise RuntimeError("run_coroutine called from the event loop thread; await the coroutine instead")
+
+    future = submit(coro)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
 def run_async(coro_func):
     """
     Decorator to run an async function in the global event loop
-    
+
     Args:
         coro_func: The coroutine function to run
-        
+
     Returns:
         A wrapper function that runs the coroutine in the global event loop
     """
     @functools.wraps(coro_func)
     def wrapper(*args, **kwargs):
         try:
-            loop = get_event_loop()
-            logger.critical(f"[ASYNC_HELPER_DEBUG] Running coroutine function {coro_func.__name__} in loop {loop}")
-            return loop.run_until_complete(coro_func(*args, **kwargs))
+            return run_coroutine(coro_func(*args, **kwargs))
         except Exception as e:
             logger.critical(f"[ASYNC_HELPER_DEBUG] Error in run_async for {coro_func.__name__}: {str(e)}")
             logger.critical(f"[ASYNC_HELPER_DEBUG] Traceback: {traceback.format_exc()}")
             raise
-    
+
     return wrapper
 
-def safe_run_coroutine(coro, default_result=None):
+
+def safe_run_coroutine(coro, default_result=None, timeout=DEFAULT_TIMEOUT):
     """
     Safely run a coroutine in the global event loop
-    
+
     Args:
         coro: The coroutine to run
         default_result: The default result to return if an error occurs
-        
+        timeout (float): Seconds to wait before giving up (the coroutine is cancelled)
+
     Returns:
         The result of the coroutine, or the default result if an error occurs
     """
+    # Get coroutine name if possible for better debugging
+    coro_name = getattr(coro, "__qualname__", str(coro))
     try:
-        # Get coroutine name if possible for better debugging
-        coro_name = getattr(coro, "__qualname__", str(coro))
-        
-        # Get the event loop
-        loop = get_event_loop()
-        logger.critical(f"[ASYNC_HELPER_DEBUG] Safely running coroutine {coro_name} in loop {loop}")
-        
-        # Actually run the coroutine
-        result = loop.run_until_complete(coro)
-        logger.critical(f"[ASYNC_HELPER_DEBUG] Coroutine {coro_name} completed successfully")
+        result = run_coroutine(coro, timeout)
+        logger.debug(f"[ASYNC_HELPER_DEBUG] Coroutine {coro_name} completed successfully")
         return result
+    except concurrent.futures.TimeoutError:
+        logger.critical(f"[ASYNC_HELPER_DEBUG] Coroutine {coro_name} timed out after {timeout}s")
+        return default_result
     except Exception as e:
-        logger.critical(f"[ASYNC_HELPER_DEBUG] Error running coroutine: {str(e)}")
+        logger.critical(f"[ASYNC_HELPER_DEBUG] Error running coroutine {coro_name}: {str(e)}")
         logger.critical(f"[ASYNC_HELPER_DEBUG] Traceback: {traceback.format_exc()}")
-        return default_result
\ No newline at end of file
+        return default_result
@@ -3,26 +3,338 @@ import re
 import time
 import requests
 import threading
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from logger import get_logger
+from link_extraction import extract_telegram_links
+from rate_limiter import HostRateLimiter
+from http_cache import http_cache
+from token_pool import token_pool
+from html_parsing import get_parser
 from avalai_api import avalai_client
 from perplexity_api import perplexity_client
 
 # Get application logger
 logger = get_logger(__name__)
 
+# Hosts contacted during a channel sweep and how many requests per second each may get
+TELEGRAM_API_HOST = "api.telegram.org"
+TELEGRAM_WEB_HOST = "t.me"
+CHANNEL_SWEEP_RATES = {
+    TELEGRAM_API_HOST: 10.0,
+    TELEGRAM_WEB_HOST: 3.0
+}
+
+# Incremental scraping of t.me/s/<channel> pages
+CHANNEL_POST_ID_PATTERN = re.compile(r'data-post="[^"/]+/(\d+)"')
+SCRAPE_PAGE_SIZE = 20   # Posts per t.me/s/ page; a shorter page means there is nothing newer
+MAX_SCRAPE_PAGES = 5    # Upper bound on pages fetched per channel per sweep
+
+# Read-only Bot API methods whose answer does not depend on which bot asks, so they
+# can be spread over all configured tokens. getUpdates and sendMessage stay on the
+# main token: updates belong to one bot and users only talk to the main bot.
+POOLED_METHODS = frozenset([
+    'getChat', 'getChatMemberCount', 'getChatMembersCount', 'getChatAdministrators'
+])
+
+# Seconds a successful getMe answer is trusted before the token is validated again
+GET_ME_TTL = 600
+
+def generate_private_reply(message):
+    """
+    Generate the AI reply to a private message and log it to the chat history
+    
+    This blocks while the AI service answers, so callers that must stay
+    responsive run it in a worker thread.
+    
+    Args:
+        message (dict): The Telegram message object
+        
+    Returns:
+        tuple: (chat_id, reply text or None if there is nothing to send)
+    """
+    try:
+        # Get message details
+        message_text = message.get('text', '')
+        chat_id = message['chat']['id']
+        user_id = message['from']['id']
+        
+        logger.critical(f"[BOT_DIRECT_DEBUG] Received private message from user {user_id}: {message_text[:50]}...")
+        
+        # Extract user information
+        username = message['from'].get('username', '')
+        first_name = message['from'].get('first_name', '')
+        last_name = message['from'].get('last_name', '')
+        display_name = username or f"{first_name} {last_name}".strip() or f"کاربر {user_id}"
+        
+        # Create conversation ID
+        conversation_id = f"direct_{user_id}"
+        
+        # Create metadata for logging
+        message_metadata = {
+            "user_id": str(user_id),
+            "username": username,
+            "first_name": first_name,
+            "last_name": last_name,
+            "display_name": display_name,
+            "chat_id": str(chat_id),
+            "received_at": datetime.now().isoformat(),
+            "conversation_id": conversation_id,
+            "via": "direct_api"
+        }
+        
+        logger.critical(f"[BOT_DIRECT_DEBUG] Message metadata: {message_metadata}")
+        
+        # First check if Perplexity API is enabled - it takes priority if both are enabled
+        if perplexity_client.is_enabled():
+            logger.critical(f"[BOT_DIRECT_DEBUG] Generating Perplexity AI response for {display_name}")
+            
+            # Request AI response from Perplexity
+            response_data = perplexity_client.generate_response(
+                user_message=message_text,
+                user_id=str(user_id),
+                username=display_name,
+                conversation_id=conversation_id,
+                metadata=message_metadata
+            )
+            
+            reply = None
+            if response_data["success"] and response_data["response"]:
+                reply = response_data["response"]
+            else:
+                error = response_data.get("error", "دریافت پاسخ با خطا مواجه شد")
+                logger.critical(f"[BOT_DIRECT_DEBUG] Failed to get Perplexity AI response: {error}")
+                
+                # Log error in Perplexity chat history
+                perplexity_client._log_chat(
+                    user_message=message_text,
+                    ai_response=f"[خطا در دریافت پاسخ Perplexity: {error}]",
+                    user_id=str(user_id),
+                    username=display_name,
+                    metadata=message_metadata
+                )
+            
+            # Always log to Avalai history for display in admin panel (if Avalai is enabled)
+            if avalai_client.is_enabled():
+                avalai_client._log_chat(
+                    user_message=message_text,
+                    ai_response=response_data.get("response", "[پاسخ توسط Perplexity ارسال شد]"),
+                    user_id=str(user_id),
+                    username=display_name,
+                    metadata=message_metadata
+                )
+            
+            return chat_id, reply
+        
+        # If Perplexity is not enabled, try Avalai
+        if avalai_client.is_enabled():
+            # Always respond in debug mode
+            logger.critical(f"[BOT_DIRECT_DEBUG] Generating Avalai response for {display_name}")
+            
+            # Request AI response from Avalai
+            response_data = avalai_client.generate_response(
+                user_message=message_text,
+                user_id=str(user_id),
+                username=display_name,
+                conversation_id=conversation_id,
+                metadata=message_metadata
+            )
+            
+            if response_data["success"] and response_data["response"]:
+                return chat_id, response_data["response"]
+            
+            error = response_data.get("error", "دریافت پاسخ با خطا مواجه شد")
+            logger.critical(f"[BOT_DIRECT_DEBUG] Failed to get Avalai response: {error}")
+            
+            # Log error in chat history
+            avalai_client._log_chat(
+                user_message=message_text,
+                ai_response=f"[خطا در دریافت پاسخ آوالای: {error}]",
+                user_id=str(user_id),
+                username=display_name,
+                metadata=message_metadata
+            )
+            return chat_id, None
+        
+        # If no AI service is enabled, log without responding
+        logger.critical("[BOT_DIRECT_DEBUG] No AI service is enabled, logging message but not responding")
+        # Still log message in Avalai history without response (for admin panel)
+        avalai_client._log_chat(
+            user_message=message_text,
+            ai_response="[پاسخی ارسال نشد - هیچ سرویس هوش مصنوعی فعال نیست]",
+            user_id=str(user_id),
+            username=display_name,
+            metadata=message_metadata
+        )
+        
+    except Exception as e:
+        logger.critical(f"[BOT_DIRECT_DEBUG] Error handling private message: {str(e)}")
+        import traceback
+        logger.critical(f"[BOT_DIRECT_DEBUG] Traceback: {traceback.format_exc()}")
+    
+    return message.get('chat', {}).get('id'), None
+
+
+def log_private_message(message):
+    """
+    Save an incoming private message to the AI chat histories for the admin panel
+    
+    Args:
+        message (dict): The Telegram message object
+    """
+    try:
+        user_id = message.get('from', {}).get('id', 'unknown')
+        username = message.get('from', {}).get('username', '')
+        first_name = message.get('from', {}).get('first_name', '')
+        last_name = message.get('from', {}).get('last_name', '')
+        display_name = username or f"{first_name} {last_name}".strip() or f"کاربر {user_id}"
+        message_text = message.get('text', '')
+        
+        # Create additional metadata for troubleshooting
+        message_metadata = {
+            "user_id": str(user_id),
+            "username": username, 
+            "display_name": display_name,
+            "received_at": datetime.now().isoformat(),
+            "via": "direct_bot_api",
+            "bot_username": "@tourbotsbot"
+        }
+        
+        # Try Perplexity first (if enabled), then fallback to Avalai
+        if perplexity_client.is_enabled():
+            logger.critical(f"[BOT_DEBUG] Saving message to Perplexity history: {message_text[:100]}")
+            
+            # Force save to chat history
+            perplexity_client._log_chat(
+                user_message=message_text,
+                ai_response="[در حال پردازش پاسخ با Perplexity...]",
+                user_id=str(user_id),
+                username=display_name,
+                metadata=message_metadata
+            )
+            
+        # Always log to Avalai too for the admin panel
+        if avalai_client.is_enabled():
+            logger.critical(f"[BOT_DEBUG] Saving message to Avalai history: {message_text[:100]}")
+            
+            # Force save to chat history
+            avalai_client._log_chat(
+                user_message=message_text,
+                ai_response="[در حال پردازش پاسخ...]",
+                user_id=str(user_id),
+                username=display_name,
+                metadata=message_metadata
+            )
+    except Exception as e:
+        logger.critical(f"[BOT_DEBUG] Error saving message to chat history: {str(e)}")
+
+
 class TelegramBot:
     """Simple Telegram Bot implementation using direct API calls"""
     
-    def __init__(self, token):
+    def __init__(self, token, pool_connections=4, pool_maxsize=16, keep_alive=True, token_pool=None):
+        """
+        Initialize the bot
+        
+        Args:
+            token (str): The bot token
+            pool_connections (int): Number of hosts to keep connection pools for
+            pool_maxsize (int): Connections kept open per host; should cover the
+                number of threads using the bot at once (polling plus sweep workers)
+            keep_alive (bool): Reuse connections between requests
+            token_pool (BotTokenPool, optional): Tokens to spread POOLED_METHODS calls over
+        """
         self.token = token
         self.api_base_url = f"https://api.telegram.org/bot{token}/"
         self.last_update_id = 0
         self.private_message_handlers = []
+        self.async_bot = None  # AsyncTelegramBot doing the polling, if start_polling chose it
+        self.token_pool = token_pool
+        self._polling = False
+        self._stop_polling = threading.Event()
+        
+        # Cached getMe answer and when it was fetched
+        self._me = None
+        self._me_fetched_at = 0.0
+        self._me_lock = threading.Lock()
+        
+        # One pooled session for every request the bot makes (API calls and
+        # t.me page scrapes), so TCP and TLS handshakes are paid once per connection
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+    
+    def get_connection_stats(self):
+        """
+        Get connection reuse counters for the bot's session
+        
+        Returns:
+            dict: Requests sent, connections opened and requests that reused a connection,
+                per host and in total
+        """
+        hosts = {}
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host_stats = hosts.setdefault(pool.host, {'requests': 0, 'connections': 0})
+            host_stats['requests'] += pool.num_requests
+            host_stats['connections'] += pool.num_connections
+        
+        total_requests = sum(stats['requests'] for stats in hosts.values())
+        total_connections = sum(stats['connections'] for stats in hosts.values())
+        for stats in hosts.values():
+            stats['reused'] = max(stats['requests'] - stats['connections'], 0)
+        
+        return {
+            'requests': total_requests,
+            'connections': total_connections,
+            'reused': max(total_requests - total_connections, 0),
+            'reuse_ratio': (total_requests - total_connections) / total_requests if total_requests else 0.0,
+            'hosts': hosts
+        }
+    
+    def get_me(self, max_age=GET_ME_TTL):
+        """
+        Get the bot's getMe answer, asking Telegram only when the cached one is too old
+        
+        Args:
+            max_age (float): Seconds a successful answer stays valid
+            
+        Returns:
+            dict: The getMe response; failures are returned but not cached
+        """
+        with self._me_lock:
+            if self._me is not None and time.monotonic() - self._me_fetched_at < max_age:
+                return self._me
+            
+            me = self.make_request('getMe')
+            if me.get('ok'):
+                if self._me is None:
+                    logger.info(f"Bot initialized: @{me['result'].get('username')}")
+                self._me = me
+                self._me_fetched_at = time.monotonic()
+            return me
+    
+    def close(self):
+        """Stop polling and close the pooled connections"""
+        self._stop_polling.set()
+        if self.async_bot:
+            self.async_bot.stop()
+        self.session.close()
     
     def make_request(self, method, params=None):
-        """Make a request to the Telegram API"""
-        url = self.api_base_url + method
+        """Make a request to the Telegram API
+        
+        Methods in POOLED_METHODS go out on the least loaded token of the token pool;
+        everything else uses the bot's own token.
+        """
+        pooled = self.token_pool is not None and method in POOLED_METHODS and len(self.token_pool) > 1
         max_retries = 3
         retry_delay = 1  # seconds
         
@@ -48,7 +360,44 @@ class TelegramBot:
         
         for attempt in range(max_retries):
             try:
-                response = requests.post(url, data=params or {}, timeout=30)  # Add timeout
+                token = self.token_pool.acquire() if pooled else self.token
+            except ValueError as e:
+                # Every pooled token has been disabled
+                return {"ok": False, "description": str(e)}
+            retry_after = None
+            try:
+                url = f"https://api.telegram.org/bot{token}/{method}"
+                response = self.session.post(url, data=params or {}, timeout=30)  # Add timeout
+                
+                # Flood control: the token sits out for retry_after seconds
+                if response.status_code == 429:
+                    retry_after = response.json().get('parameters', {}).get('retry_after', retry_delay)
+                    logger.warning(f"Rate limited on {method} (attempt {attempt+1}/{max_retries}), retry after {retry_after}s")
+                    if attempt == max_retries - 1:
+                        return {"ok": False, "description": f"Too Many Requests: retry after {retry_after}", "error_code": 429}
+                    if not pooled:
+                        if self.token_pool is not None:
+                            self.token_pool.penalize(token, retry_after)
+                        time.sleep(retry_after)
+                    # A pooled call is simply retried on another token
+                    continue
+                
+                # Revoked or invalid token: keep it out of the pool so other calls stop landing on it
+                if response.status_code == 401:
+                    description = response.json().get('description', 'Unauthorized')
+                    logger.error(f"Token ...{token[-6:]} refused on {method}: {description}")
+                    if self.token_pool is not None:
+                        self.token_pool.disable(token, description)
+                    if pooled and attempt < max_retries - 1:
+                        continue
+                    return {"ok": False, "description": description, "error_code": 401}
+                
+                # Forbidden is about the chat or user (blocked, kicked, no rights), not the
+                # token: this call fails, and neither the token nor other tokens are tried
+                if response.status_code == 403:
+                    description = response.json().get('description', 'Forbidden')
+                    logger.warning(f"{method} forbidden for {params.get('chat_id')}: {description}")
+                    return {"ok": False, "description": description, "error_code": 403}
                 
                 # Check for Bad Request errors (400)
                 if response.status_code == 400:
@@ -82,6 +431,9 @@ class TelegramBot:
                 else:
                     logger.error(f"Max retries reached for {method}")
                     return {"ok": False, "description": f"Request failed after {max_retries} attempts: {str(e)}"}
+            finally:
+                if pooled:
+                    self.token_pool.release(token, retry_after)
         
         # If we get here, something unexpected happened
         return {"ok": False, "description": "Unknown error occurred"}
@@ -116,139 +468,44 @@ class TelegramBot:
     def _handle_private_message(self, message):
         """Internal handler for private messages
         
-        Calls all registered handlers with the message
+        Generates the AI reply and sends it (blocking until both are done)
         """
-        try:
-            # Get message details
-            message_text = message.get('text', '')
-            chat_id = message['chat']['id']
-            user_id = message['from']['id']
-            
-            logger.critical(f"[BOT_DIRECT_DEBUG] Received private message from user {user_id}: {message_text[:50]}...")
+        chat_id, reply = generate_private_reply(message)
+        if reply:
+            logger.critical(f"[BOT_DIRECT_DEBUG] Sending AI response: {reply[:50]}...")
+            self.send_message(chat_id, reply)
             
-            # Extract user information
-            username = message['from'].get('username', '')
-            first_name = message['from'].get('first_name', '')
-            last_name = message['from'].get('last_name', '')
-            display_name = username or f"{first_name} {last_name}".strip() or f"کاربر {user_id}"
-            
-            # Create conversation ID
-            conversation_id = f"direct_{user_id}"
-            
-            # Create metadata for logging
-            message_metadata = {
-                "user_id": str(user_id),
-                "username": username,
-                "first_name": first_name,
-                "last_name": last_name,
-                "display_name": display_name,
-                "chat_id": str(chat_id),
-                "received_at": datetime.now().isoformat(),
-                "conversation_id": conversation_id,
-                "via": "direct_api"
-            }
-            
-            logger.critical(f"[BOT_DIRECT_DEBUG] Message metadata: {message_metadata}")
-            
-            # First check if Perplexity API is enabled - it takes priority if both are enabled
-            if perplexity_client.is_enabled():
-                logger.critical(f"[BOT_DIRECT_DEBUG] Generating Perplexity AI response for {display_name}")
-                
-                # Request AI response from Perplexity
-                response_data = perplexity_client.generate_response(
-                    user_message=message_text,
-                    user_id=str(user_id),
-                    username=display_name,
-                    conversation_id=conversation_id,
-                    metadata=message_metadata
-                )
-                
-                if response_data["success"] and response_data["response"]:
-                    # Send AI response
-                    ai_response = response_data["response"]
-                    logger.critical(f"[BOT_DIRECT_DEBUG] Sending Perplexity AI response: {ai_response[:50]}...")
-                    self.send_message(chat_id, ai_response)
-                else:
-                    error = response_data.get("error", "دریافت پاسخ با خطا مواجه شد")
-                    logger.critical(f"[BOT_DIRECT_DEBUG] Failed to get Perplexity AI response: {error}")
-                    
-                    # Log error in Perplexity chat history
-                    perplexity_client._log_chat(
-                        user_message=message_text,
-                        ai_response=f"[خطا در دریافت پاسخ Perplexity: {error}]",
-                        user_id=str(user_id),
-                        username=display_name,
-                        metadata=message_metadata
-                    )
-                
-                # Always log to Avalai history for display in admin panel (if Avalai is enabled)
-                if avalai_client.is_enabled():
-                    avalai_client._log_chat(
-                        user_message=message_text,
-                        ai_response=response_data.get("response", "[پاسخ توسط Perplexity ارسال شد]"),
-                        user_id=str(user_id),
-                        username=display_name,
-                        metadata=message_metadata
-                    )
-                
-                return
-            
-            # If Perplexity is not enabled, try Avalai
-            if avalai_client.is_enabled():
-                # Always respond in debug mode
-                logger.critical(f"[BOT_DIRECT_DEBUG] Generating Avalai response for {display_name}")
-                
-                # Request AI response from Avalai
-                response_data = avalai_client.generate_response(
-                    user_message=message_text,
-                    user_id=str(user_id),
-                    username=display_name,
-                    conversation_id=conversation_id,
-                    metadata=message_metadata
-                )
-                
-                if response_data["success"] and response_data["response"]:
-                    # Send AI response
-                    ai_response = response_data["response"]
-                    logger.critical(f"[BOT_DIRECT_DEBUG] Sending Avalai response: {ai_response[:50]}...")
-                    self.send_message(chat_id, ai_response)
-                else:
-                    error = response_data.get("error", "دریافت پاسخ با خطا مواجه شد")
-                    logger.critical(f"[BOT_DIRECT_DEBUG] Failed to get Avalai response: {error}")
-                    
-                    # Log error in chat history
-                    avalai_client._log_chat(
-                        user_message=message_text,
-                        ai_response=f"[خطا در دریافت پاسخ آوالای: {error}]",
-                        user_id=str(user_id),
-                        username=display_name,
-                        metadata=message_metadata
-                    )
-                
-                return
-            
-            # If no AI service is enabled, log without responding
-            logger.critical("[BOT_DIRECT_DEBUG] No AI service is enabled, logging message but not responding")
-            # Still log message in Avalai history without response (for admin panel)
-            avalai_client._log_chat(
-                user_message=message_text,
-                ai_response="[پاسخی ارسال نشد - هیچ سرویس هوش مصنوعی فعال نیست]",
-                user_id=str(user_id),
-                username=display_name,
-                metadata=message_metadata
-            )
-                
-        except Exception as e:
-            logger.critical(f"[BOT_DIRECT_DEBUG] Error handling private message: {str(e)}")
-            import traceback
-            logger.critical(f"[BOT_DIRECT_DEBUG] Traceback: {traceback.format_exc()}")
-            
-    def start_polling(self):
-        """Start polling for updates in background thread"""
+    def start_polling(self, use_async=None):
+        """Start polling for updates in the background
+        
+        With aiohttp installed the asyncio client from async_bot takes over: it
+        long-polls in its own task and generates AI replies in worker threads, so a
+        slow reply does not hold up other updates. Otherwise a polling thread is used.
+        
+        Args:
+            use_async (bool, optional): Use the asyncio client; defaults to the
+                BOT_ASYNC_POLLING environment variable, else to whether aiohttp is installed
+        """
+        from async_bot import AsyncTelegramBot, AIOHTTP_AVAILABLE
+        
+        # The bot instance is shared, so a second call must not start a second poller
+        if self._polling:
+            logger.info("Update polling already running for this bot")
+            return
+        self._polling = True
+        
+        if use_async is None:
+            use_async = os.environ.get("BOT_ASYNC_POLLING", "1").lower() not in ("0", "false", "no")
+        if use_async and AIOHTTP_AVAILABLE:
+            self.async_bot = AsyncTelegramBot(self.token, private_message_handlers=self.private_message_handlers)
+            self.async_bot.last_update_id = self.last_update_id
+            self.async_bot.start_in_thread()
+            return
+        
         logger.critical("[BOT_DEBUG] Starting background update polling")
         
         def update_worker():
-            while True:
+            while not self._stop_polling.is_set():
                 try:
                     # Get updates with offset
                     updates_result = self.get_updates(offset=self.last_update_id + 1, timeout=30)
@@ -279,55 +536,10 @@ class TelegramBot:
                                     self._handle_private_message(update['message'])
                                     
                                     # Always save message to chat history to ensure it appears in the admin panel
-                                    try:
-                                        message = update['message']
-                                        user_id = message.get('from', {}).get('id', 'unknown')
-                                        username = message.get('from', {}).get('username', '')
-                                        first_name = message.get('from', {}).get('first_name', '')
-                                        last_name = message.get('from', {}).get('last_name', '')
-                                        display_name = username or f"{first_name} {last_name}".strip() or f"کاربر {user_id}"
-                                        message_text = message.get('text', '')
-                                        
-                                        # Create additional metadata for troubleshooting
-                                        message_metadata = {
-                                            "user_id": str(user_id),
-                                            "username": username, 
-                                            "display_name": display_name,
-                                            "received_at": datetime.now().isoformat(),
-                                            "via": "direct_bot_api",
-                                            "bot_username": "@tourbotsbot"
-                                        }
-                                        
-                                        # Try Perplexity first (if enabled), then fallback to Avalai
-                                        if perplexity_client.is_enabled():
-                                            logger.critical(f"[BOT_DEBUG] Saving message to Perplexity history: {message_text[:100]}")
-                                            
-                                            # Force save to chat history
-                                            perplexity_client._log_chat(
-                                                user_message=message_text,
-                                                ai_response="[در حال پردازش پاسخ با Perplexity...]",
-                                                user_id=str(user_id),
-                                                username=display_name,
-                                                metadata=message_metadata
-                                            )
-                                            
-                                        # Always log to Avalai too for the admin panel
-                                        if avalai_client.is_enabled():
-                                            logger.critical(f"[BOT_DEBUG] Saving message to Avalai history: {message_text[:100]}")
-                                            
-                                            # Force save to chat history
-                                            avalai_client._log_chat(
-                                                user_message=message_text,
-                                                ai_response="[در حال پردازش پاسخ...]",
-                                                user_id=str(user_id),
-                                                username=display_name,
-                                                metadata=message_metadata
-                                            )
-                                    except Exception as e:
-                                        logger.critical(f"[BOT_DEBUG] Error saving message to chat history: {str(e)}")
-                    
-                    # Sleep a bit to avoid hammering the API
-                    time.sleep(1)
+                                    log_private_message(update['message'])
+                    else:
+                        # Back off a little when the poll itself failed
+                        time.sleep(1)
                     
                 except Exception as e:
                     logger.critical(f"[BOT_DEBUG] Error in update worker: {str(e)}")
@@ -342,8 +554,62 @@ class TelegramBot:
         logger.critical("[BOT_DEBUG] Background update thread started")
 
 
+class BotRegistry:
+    """
+    Keeps one TelegramBot per token for the life of the process
+    
+    Every sweep, the polling thread and the web routes get the same instance, so
+    its pooled connections and cached getMe answer are reused instead of a new
+    bot and a getMe round trip per run.
+    """
+    
+    def __init__(self):
+        self._bots = {}
+        self._lock = threading.Lock()
+    
+    def get(self, token):
+        """
+        Get the bot for a token, creating it on first use
+        
+        Args:
+            token (str): The bot token
+            
+        Returns:
+            TelegramBot: The shared bot instance (not yet validated)
+        """
+        with self._lock:
+            bot = self._bots.get(token)
+            if bot is None:
+                bot = TelegramBot(token, token_pool=token_pool)
+                self._bots[token] = bot
+            return bot
+    
+    def discard(self, token):
+        """
+        Close and forget the bot for a token (e.g. when the token is removed)
+        
+        Args:
+            token (str): The bot token
+        """
+        with self._lock:
+            bot = self._bots.pop(token, None)
+        if bot:
+            bot.close()
+
+
+# Shared bot instances
+bot_registry = BotRegistry()
+
+
 def setup_bot(link_manager):
-    """Set up and configure the Telegram bot"""
+    """Get the shared, validated Telegram bot for the configured token
+    
+    The bot comes from bot_registry, and getMe is only sent when the cached answer
+    is older than GET_ME_TTL, so calling this on every sweep is cheap.
+    
+    Returns:
+        TelegramBot: The bot, or None if no token is set or the token is invalid
+    """
     
     # Get token from environment variable
     token = os.environ.get("TELEGRAM_BOT_TOKEN")
@@ -352,16 +618,18 @@ def setup_bot(link_manager):
         return None
     
     try:
-        # Create a bot instance
-        bot = TelegramBot(token)
+        # The main token comes first; extra stored tokens share the read-only API calls
+        token_pool.set_tokens([token] + link_manager.get_all_telegram_tokens())
+        
+        bot = bot_registry.get(token)
         
-        # Test the bot connection
-        me = bot.make_request('getMe')
+        # Test the bot connection (answered from cache while it is fresh)
+        me = bot.get_me()
         if not me.get('ok'):
             logger.error(f"Failed to initialize bot: {me.get('description')}")
             return None
             
-        logger.info(f"Bot initialized: @{me['result']['username']}")
+        logger.debug(f"Bot ready: @{me['result']['username']} ({len(token_pool)} tokens in pool)")
         return bot
     except Exception as e:
         logger.error(f"Failed to initialize bot: {str(e)}")
@@ -370,15 +638,265 @@ def setup_bot(link_manager):
         return None
 
 
-def check_channels_for_links(bot, link_manager, max_channels=100, remove_invalid=True):
+def _scrape_new_channel_posts(bot, channel, last_message_id, message_limit, rate_limiter, cache_sweep=None):
+    """
+    Fetch the posts of a public channel that are newer than its high-water mark
+    
+    The first visit reads the newest message_limit posts of t.me/s/<channel>. Later
+    visits page forward with ?after=<id> and stop at the first page without unseen
+    posts; a page the HTTP cache reports unchanged is not looked at, and post ids
+    are read from the raw HTML first, so a page with nothing new is never parsed.
+    
+    Args:
+        bot: The Telegram bot instance (its pooled session is used)
+        channel: The channel name
+        last_message_id: Id of the newest post already processed, or None
+        message_limit: Number of posts to read on the first visit
+        rate_limiter: HostRateLimiter shared by the sweep's workers
+        cache_sweep: HttpCacheSweep to fetch through, or None to bypass the cache
+    
+    Returns:
+        tuple: ([(post_id, message_text)] newest first, newest post id seen or None,
+            URLs fetched through cache_sweep; commit them once the posts' links are stored)
+    """
+    posts = []
+    newest_id = last_message_id
+    cursor = last_message_id
+    fetched_urls = []
+    
+    for _ in range(MAX_SCRAPE_PAGES):
+        channel_url = f"https://t.me/s/{channel}"
+        if cursor:
+            channel_url += f"?after={cursor}"
+        rate_limiter.wait(TELEGRAM_WEB_HOST)
+        if cache_sweep:
+            response = cache_sweep.fetch(channel_url, session=bot.session, timeout=10)
+            fetched_urls.append(channel_url)
+            if not response.changed:
+                # 304 or same body as last time: nothing new on this page
+                break
+        else:
+            response = bot.session.get(channel_url, timeout=10)
+        if response.status_code != 200:
+            raise Exception(f"Failed to scrape channel webpage, status: {response.status_code}")
+        
+        # Cheap check before parsing: are there any posts we have not seen?
+        page_ids = [int(post_id) for post_id in CHANNEL_POST_ID_PATTERN.findall(response.text)]
+        unseen_ids = [post_id for post_id in page_ids if not cursor or post_id > cursor]
+        if not unseen_ids:
+            break
+        
+        page_posts = []
+        # The page lists posts oldest first; walk it newest first and stop at the first seen post
+        for post_id, message_text in reversed(get_parser().channel_posts(response.text)):
+            if post_id is None:
+                continue
+            if cursor and post_id <= cursor:
+                break
+            page_posts.append((post_id, message_text))
+        posts.extend(page_posts)
+        newest_id = max([newest_id or 0] + unseen_ids)
+        
+        # First visit: only the latest page, capped at message_limit posts
+        if not last_message_id:
+            posts = posts[:message_limit]
+            break
+        
+        # A short page means we have caught up with the channel
+        if len(unseen_ids) < SCRAPE_PAGE_SIZE:
+            break
+        cursor = max(unseen_ids)
+    
+    posts.sort(key=lambda item: item[0], reverse=True)
+    return posts, newest_id, fetched_urls
+
+
+def _message_link_items(message_texts):
+    """
+    Pair every Telegram link in a set of messages with the message it came from
+    
+    Each message is scanned once, so the pairs come out directly instead of
+    searching all messages again for every link.
+    
+    Args:
+        message_texts: Iterable of message texts
+    
+    Yields:
+        tuple: (link, message_text) for each link, in message order
+    """
+    for message_text in message_texts:
+        if not message_text:
+            continue
+        # استخراج لینک‌های تلگرام به شکل نرمال‌شده با ماژول مشترک استخراج لینک
+        for link in extract_telegram_links(message_text, include_mentions=False):
+            yield link, message_text
+
+
+def _check_channel(bot, link_manager, channel, position, channel_count, remove_invalid, rate_limiter,
+                   cache_sweep=None):
+    """
+    Check a single channel for new links (runs on a sweep worker thread)
+    
+    Args:
+        bot: The Telegram bot instance
+        link_manager: The LinkManager instance
+        channel: The channel name
+        position: 1-based position of the channel in the sweep, for logging
+        channel_count: Number of channels in the sweep, for logging
+        remove_invalid: If True, remove the channel when it returns a "chat not found" error
+        rate_limiter: HostRateLimiter shared by the sweep's workers
+        cache_sweep: HttpCacheSweep for the channel page fetches
+    
+    Returns:
+        int: Number of new links found in the channel
+    """
+    new_links = 0
+    try:
+        logger.info(f"Checking channel {position}/{channel_count}: {channel}")
+        
+        # We'll try to get the latest messages from the channel
+        # This requires the bot to be a member of the channel
+        chat_id = f"@{channel}"
+        
+        try:
+            # Get channel information to verify bot access; a fresh cached answer
+            # saves the API round trip and its rate limiter slot
+            chat_info = link_manager.get_cached_chat(channel)
+            if chat_info is None:
+                rate_limiter.wait(TELEGRAM_API_HOST)
+                chat_info = bot.get_chat(chat_id)
+                link_manager.cache_chat(channel, chat_info)
+            if not chat_info.get('ok'):
+                logger.error(f"Error accessing channel {chat_id}: {chat_info.get('description')}")
+                return new_links
+            
+            chat = chat_info['result']
+            logger.info(f"Connected to channel: {chat.get('title', 'Unknown')} ({chat_id})"
+                        f"{' [cached]' if chat_info.get('cached') else ''}")
+            
+            # Try to get the recent messages from this channel
+            try:
+                # In a real-world scenario, we would use getHistory API
+                # For now, we'll try scraping first as it's more reliable
+                # (link, message_text) pairs; the message text gives categorization its context
+                link_items = []
+                scraped = False
+                newest_id = None
+                fetched_urls = []
+                
+                # Try to fetch the channel's messages directly from URL (public channel messages)
+                try:
+                    # Only posts newer than the channel's high-water mark are fetched and parsed
+                    last_message_id = link_manager.get_channel_last_message_id(channel)
+                    posts, newest_id, fetched_urls = _scrape_new_channel_posts(
+                        bot, channel, last_message_id, link_manager.check_message_count, rate_limiter, cache_sweep
+                    )
+                    scraped = True
+                    
+                    link_items.extend(_message_link_items(message_text for _, message_text in posts))
+                    
+                    logger.info(f"Found {len(link_items)} links in {len(posts)} new posts by scraping channel webpage")
+                except Exception as e:
+                    logger.warning(f"Error scraping channel webpage: {str(e)}")
+                    # Don't use fallback links in production
+                
+                # Only try API method if web scraping didn't work
+                if not scraped:
+                    # Try to use Telegram API methods
+                    try:
+                        # First try getHistory if available
+                        channel_id = chat.get('id')
+                        rate_limiter.wait(TELEGRAM_API_HOST)
+                        history = bot.make_request('getHistory', {
+                            'chat_id': channel_id,
+                            'limit': 10
+                        })
+                        
+                        if history.get('ok'):
+                            messages = history.get('result', [])
+                            logger.info(f"Got {len(messages)} messages from channel history")
+                            
+                            # Process messages for links
+                            link_items.extend(_message_link_items(message.get('text') for message in messages))
+                        else:
+                            logger.debug("getHistory not supported or not authorized")
+                            
+                            # If getHistory didn't work, fall back to getUpdates
+                            rate_limiter.wait(TELEGRAM_API_HOST)
+                            updates_response = bot.make_request('getUpdates', {
+                                'offset': -10,  # Get last 10 messages
+                                'limit': 10
+                            })
+                            
+                            if updates_response.get('ok'):
+                                updates = updates_response.get('result', [])
+                                logger.debug(f"Retrieved {len(updates)} updates")
+                                
+                                # Process updates for links
+                                link_items.extend(_message_link_items(
+                                    update.get('message', {}).get('text') for update in updates
+                                ))
+                    except Exception as e:
+                        logger.warning(f"Error using Telegram API: {str(e)}")
+                
+                # Add the links to storage with channel info in one batch
+                for link, is_new in link_manager.add_links_bulk(link_items, channel=channel):
+                    if is_new:
+                        logger.info(f"Added new link: {link} from channel {channel}")
+                        new_links += 1
+                    else:
+                        logger.debug(f"Link already exists: {link}")
+                
+                # Only now that their links are stored do the scraped posts count as seen,
+                # and their pages as cached
+                if newest_id:
+                    link_manager.set_channel_last_message_id(channel, newest_id)
+                for url in fetched_urls:
+                    cache_sweep.commit(url)
+            
+            except Exception as e:
+                logger.error(f"Error getting messages: {str(e)}")
+                import traceback
+                logger.error(f"Traceback: {traceback.format_exc()}")
+        
+        except Exception as e:
+            logger.error(f"Error accessing channel {chat_id}: {str(e)}")
+            
+            # Check if this is a "chat not found" error
+            error_str = str(e).lower()
+            if "chat not found" in error_str or "bad request" in error_str or "404" in error_str:
+                logger.warning(f"Channel {channel} does not exist or bot cannot access it")
+                
+                # Automatically remove invalid channels if enabled
+                if remove_invalid:
+                    logger.info(f"Removing invalid channel: {channel}")
+                    link_manager.remove_channel(channel)
+            
+            return new_links  # Skip to next channel on error
+        
+        logger.info(f"Found {new_links} new links in {channel}")
+    
+    except Exception as e:
+        logger.error(f"Error checking channel {channel}: {str(e)}")
+    
+    return new_links
+
+def check_channels_for_links(bot, link_manager, max_channels=100, remove_invalid=True,
+                             max_workers=8, rate_limiter=None):
     """
     Check monitored channels for new links
     
+    Channels are checked concurrently by a pool of worker threads; requests to the
+    Bot API and to t.me are spaced out per host by the rate limiter instead of
+    fixed sleeps between channels.
+    
     Args:
         bot: The Telegram bot instance
         link_manager: The LinkManager instance
         max_channels: Maximum number of channels to check in one run (default: 100)
         remove_invalid: If True, automatically remove channels that return "chat not found" errors
+        max_workers: Number of channels checked at the same time (default: 8)
+        rate_limiter: HostRateLimiter to use; defaults to CHANNEL_SWEEP_RATES
     
     Returns:
         int: Total number of new links found
@@ -407,171 +925,43 @@ def check_channels_for_links(bot, link_manager, max_channels=100, remove_invalid
     
     logger.info(f"Starting check for {len(channels_to_check)} channels (out of {total_channel_count})")
     
-    for idx, channel in enumerate(channels_to_check):
-        try:
-            logger.info(f"Checking channel {idx+1}/{len(channels_to_check)}: {channel}")
-            channel_new_links[channel] = 0
-            
-            # We'll try to get the latest messages from the channel
-            # This requires the bot to be a member of the channel
-            chat_id = f"@{channel}"
-            
-            try:
-                # Get channel information to verify bot access
-                chat_info = bot.get_chat(chat_id)
-                if not chat_info.get('ok'):
-                    logger.error(f"Error accessing channel {chat_id}: {chat_info.get('description')}")
-                    continue
-                    
-                chat = chat_info['result']
-                logger.info(f"Connected to channel: {chat.get('title', 'Unknown')} ({chat_id})")
-                
-                # Add a small delay between API calls to avoid rate limiting
-                time.sleep(0.5)
-                
-                # Try to get the recent messages from this channel
-                try:
-                    # In a real-world scenario, we would use getHistory API
-                    # For now, we'll try scraping first as it's more reliable
-                    found_links = []
-                    
-                    # Initialize variable for later use in link processing
-                    all_message_texts = []
-                    
-                    # Try to fetch the channel's messages directly from URL (public channel messages)
-                    try:
-                        import requests
-                        from bs4 import BeautifulSoup
-                        
-                        # Try to scrape public channel webpage for t.me links
-                        channel_url = f"https://t.me/s/{channel}"
-                        response = requests.get(channel_url, timeout=10)
-                        
-                        if response.status_code == 200:
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            message_texts = soup.select('.tgme_widget_message_text')
-                            
-                            # Store message_texts for later use
-                            all_message_texts = message_texts.copy()
-                            
-                            for message in message_texts[:10]:  # Get the first 10 messages
-                                message_text = message.get_text()
-                                # استخراج فقط بخش اصلی لینک‌های تلگرام با استفاده از الگوی بهبود یافته
-                                # الگوی جدید تا جایی که ممکن است دقیق لینک‌ها را استخراج می‌کند و کاراکترهای اضافی را حذف می‌کند
-                                raw_links = re.findall(r'(https?://t\.me/(?:joinchat/|\+)?[a-zA-Z0-9_\-/]+)', message_text)
-                                if raw_links:
-                                    found_links.extend(raw_links)
-                            
-                            logger.info(f"Found {len(found_links)} links by scraping channel webpage")
-                        else:
-                            logger.debug(f"Failed to scrape channel webpage, status: {response.status_code}")
-                    except Exception as e:
-                        logger.warning(f"Error scraping channel webpage: {str(e)}")
-                        # Don't use fallback links in production
-                    
-                    # Only try API method if web scraping didn't work
-                    if not found_links:
-                        # Try to use Telegram API methods
-                        try:
-                            # First try getHistory if available
-                            channel_id = chat.get('id')
-                            history = bot.make_request('getHistory', {
-                                'chat_id': channel_id,
-                                'limit': 10
-                            })
-                            
-                            if history.get('ok'):
-                                messages = history.get('result', [])
-                                logger.info(f"Got {len(messages)} messages from channel history")
-                                
-                                # Process messages for links
-                                for message in messages:
-                                    if 'text' in message:
-                                        text = message['text']
-                                        # استخراج فقط بخش اصلی لینک‌های تلگرام با استفاده از الگوی بهبود یافته
-                                        raw_links = re.findall(r'(https?://t\.me/(?:joinchat/|\+)?[a-zA-Z0-9_\-/]+)', text)
-                                        if raw_links:
-                                            found_links.extend(raw_links)
-                            else:
-                                logger.debug("getHistory not supported or not authorized")
-                                
-                                # If getHistory didn't work, fall back to getUpdates
-                                updates_response = bot.make_request('getUpdates', {
-                                    'offset': -10,  # Get last 10 messages
-                                    'limit': 10
-                                })
-                                
-                                if updates_response.get('ok'):
-                                    updates = updates_response.get('result', [])
-                                    logger.debug(f"Retrieved {len(updates)} updates")
-                                    
-                                    # Process updates for links
-                                    for update in updates:
-                                        if 'message' in update and 'text' in update['message']:
-                                            text = update['message']['text']
-                                            # استخراج فقط بخش اصلی لینک‌های تلگرام با استفاده از الگوی بهبود یافته
-                                            raw_links = re.findall(r'(https?://t\.me/(?:joinchat/|\+)?[a-zA-Z0-9_\-/]+)', text)
-                                            if raw_links:
-                                                found_links.extend(raw_links)
-                        except Exception as e:
-                            logger.warning(f"Error using Telegram API: {str(e)}")
-                    
-                    # Add the links to storage with channel info and message content for categorization
-                    for link in found_links:
-                        logger.debug(f"Processing link: {link}")
-                        
-                        # Get the message text containing this link if available
-                        link_message_text = None
-                        if 'all_message_texts' in locals() and all_message_texts:
-                            for message in all_message_texts[:10]:
-                                message_text = message.get_text()
-                                if link in message_text:
-                                    link_message_text = message_text
-                                    break
-                        
-                        # Use the message text for keyword detection when adding the link
-                        if link_manager.add_link(link, channel=channel, message_text=link_message_text):
-                            logger.info(f"Added new link: {link} from channel {channel}")
-                            total_new_links += 1
-                            channel_new_links[channel] += 1
-                        else:
-                            logger.debug(f"Link already exists: {link}")
-                            
-                except Exception as e:
-                    logger.error(f"Error getting messages: {str(e)}")
-                    import traceback
-                    logger.error(f"Traceback: {traceback.format_exc()}")
-                
-            except Exception as e:
-                logger.error(f"Error accessing channel {chat_id}: {str(e)}")
-                
-                # Check if this is a "chat not found" error
-                error_str = str(e).lower()
-                if "chat not found" in error_str or "bad request" in error_str or "404" in error_str:
-                    logger.warning(f"Channel {channel} does not exist or bot cannot access it")
-                    
-                    # Automatically remove invalid channels if enabled
-                    if remove_invalid:
-                        logger.info(f"Removing invalid channel: {channel}")
-                        link_manager.remove_channel(channel)
-                
-                continue  # Skip to next channel on error
-            
-            logger.info(f"Found {channel_new_links[channel]} new links in {channel}")
-            
-            # Add a delay between channels to avoid rate limiting
-            if idx < len(channels_to_check) - 1:  # Don't delay after the last channel
-                time.sleep(1)
-                
-        except Exception as e:
-            logger.error(f"Error checking channel {channel}: {str(e)}")
-            continue  # Skip to next channel on error
+    if rate_limiter is None:
+        # Bot API limits apply per token, so the API rate grows with the token pool
+        host_rates = dict(CHANNEL_SWEEP_RATES)
+        if getattr(bot, 'token_pool', None) is not None and len(bot.token_pool) > 1:
+            host_rates[TELEGRAM_API_HOST] *= len(bot.token_pool)
+        rate_limiter = HostRateLimiter(host_rates=host_rates)
+    
+    # Conditional GETs for the channel pages; hit rates are reported per sweep
+    cache_sweep = http_cache.sweep("channels")
     
+    # Each channel's links are stored with one add_links_bulk call as soon as it is checked
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="channel-sweep") as executor:
+        futures = [
+            executor.submit(_check_channel, bot, link_manager, channel, idx + 1,
+                            len(channels_to_check), remove_invalid, rate_limiter, cache_sweep)
+            for idx, channel in enumerate(channels_to_check)
+        ]
+        
+        # Collect in channel order so the summary matches a sequential sweep
+        for channel, future in zip(channels_to_check, futures):
+            channel_new_links[channel] = future.result()
+            total_new_links += channel_new_links[channel]
+
     # Update last check time
     link_manager.update_last_check_time()
     
     # Log summary
     logger.info(f"Total new links found: {total_new_links}")
+    cache_sweep.log_stats()
+    if hasattr(bot, 'get_connection_stats'):
+        stats = bot.get_connection_stats()
+        logger.info(f"HTTP connections: {stats['connections']} opened for {stats['requests']} requests "
+                    f"({stats['reuse_ratio']:.0%} reused)")
+    if getattr(bot, 'token_pool', None) is not None and len(bot.token_pool) > 1:
+        for token_stats in bot.token_pool.get_stats():
+            logger.info(f"Bot token {token_stats['token']}: {token_stats['requests']} requests, "
+                        f"{token_stats['rate_limited']} rate limited")
     for channel, count in channel_new_links.items():
         if count > 0:  # Only log channels with new links
             logger.info(f"Channel {channel}: {count} new links")
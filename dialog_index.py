@@ -0,0 +1,146 @@
+import asyncio
+import time
+from logger import get_logger
+from telethon import events
+from telethon.tl.types import (
+    Channel, Chat, ChannelForbidden, ChatForbidden, PeerChannel, PeerChat,
+    UpdateChannel, UpdateNewChannelMessage, UpdateNewMessage
+)
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Seconds the full group list is trusted before it is paged through again
+DIALOG_INDEX_TTL = 3600
+
+
+def _is_group(entity):
+    """Whether a dialog entity is a group or supergroup (not a broadcast channel)"""
+    if isinstance(entity, (ChatForbidden, ChannelForbidden)):
+        return False
+    if isinstance(entity, Chat):
+        return not getattr(entity, 'left', False) and not getattr(entity, 'deactivated', False)
+    if isinstance(entity, Channel):
+        return not entity.broadcast and not getattr(entity, 'left', False)
+    return False
+
+
+class DialogIndex:
+    """
+    Cached list of the groups an account is a member of
+
+    The first lookup pages through every dialog (iter_dialogs follows the
+    offsets, so accounts with more than one page of dialogs are fully covered)
+    and keeps the group entities. Later lookups are answered from the index
+    until it is older than the TTL. In between, update events keep it current:
+    a message from an unknown group adds that group, and UpdateChannel (joined,
+    left, kicked) adds or drops a supergroup.
+    """
+
+    def __init__(self, client, ttl=DIALOG_INDEX_TTL):
+        """
+        Initialize the index
+
+        Args:
+            client: The account's connected TelegramClient
+            ttl (float): Seconds before a full re-enumeration
+        """
+        self.client = client
+        self.ttl = ttl
+        self._groups = {}          # Entity id to entity, in dialog order
+        self._others = set()       # Ids of known dialogs that are not groups (channels, users)
+        self._refreshed_at = None  # Monotonic time of the last full enumeration
+        self._refresh_lock = asyncio.Lock()
+        self._attached = False
+
+    def attach(self):
+        """Start following update events (register once per client)"""
+        if self._attached:
+            return
+        self.client.add_event_handler(
+            self._on_update,
+            events.Raw(types=[UpdateNewChannelMessage, UpdateNewMessage, UpdateChannel])
+        )
+        self._attached = True
+
+    def invalidate(self):
+        """Force a full enumeration on the next lookup"""
+        self._refreshed_at = None
+
+    async def get_groups(self, force_refresh=False):
+        """
+        Get the account's groups
+
+        Args:
+            force_refresh (bool): Enumerate all dialogs even if the index is fresh
+
+        Returns:
+            list: Group entities, in dialog order
+        """
+        if force_refresh or self._is_stale():
+            async with self._refresh_lock:
+                # Another caller may have refreshed while we waited
+                if force_refresh or self._is_stale():
+                    await self.refresh()
+        return list(self._groups.values())
+
+    async def refresh(self):
+        """Page through all dialogs and rebuild the index"""
+        started = time.monotonic()
+        groups = {}
+        others = set()
+        dialog_count = 0
+        async for dialog in self.client.iter_dialogs():
+            dialog_count += 1
+            if _is_group(dialog.entity):
+                groups[dialog.entity.id] = dialog.entity
+            else:
+                others.add(dialog.entity.id)
+
+        self._groups = groups
+        self._others = others
+        self._refreshed_at = time.monotonic()
+        logger.info(f"Dialog index refreshed: {len(groups)} groups in {dialog_count} dialogs "
+                    f"({self._refreshed_at - started:.1f}s)")
+
+    def _is_stale(self):
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.ttl
+
+    async def _on_update(self, update):
+        """Keep the index current from update events"""
+        if self._refreshed_at is None:
+            return  # Nothing indexed yet; the first lookup enumerates everything
+
+        try:
+            if isinstance(update, UpdateChannel):
+                # Sent when the account joins, leaves or loses access to a channel
+                entity = await self.client.get_entity(PeerChannel(update.channel_id))
+                self._apply(update.channel_id, entity)
+                return
+
+            peer = getattr(update.message, 'peer_id', None)
+            if isinstance(peer, PeerChannel):
+                peer_id = peer.channel_id
+            elif isinstance(peer, PeerChat):
+                peer_id = peer.chat_id
+            else:
+                return
+
+            # Only chats the index does not know yet need a lookup
+            if peer_id not in self._groups and peer_id not in self._others:
+                self._apply(peer_id, await self.client.get_entity(peer))
+        except Exception as e:
+            # The next full refresh will catch up
+            logger.debug(f"Could not apply dialog update: {str(e)}")
+
+    def _apply(self, entity_id, entity):
+        """Add or drop one entity"""
+        if _is_group(entity):
+            if entity_id not in self._groups:
+                logger.info(f"Dialog index: added group {getattr(entity, 'title', entity_id)}")
+            self._groups[entity_id] = entity
+            self._others.discard(entity_id)
+        else:
+            self._others.add(entity_id)
+            if self._groups.pop(entity_id, None) is not None:
+                logger.info(f"Dialog index: dropped {entity_id}")
@@ -0,0 +1,263 @@
+"""
+HTML parsing backends for the scrapers.
+
+The scrapers only need a few things from a page: the posts of a t.me/s/ channel
+page (post id and message text), the href values of its links, and its visible
+text. Each backend extracts exactly those without building a BeautifulSoup tree
+of the whole document. The fastest installed backend is used by default:
+selectolax, then lxml, then BeautifulSoup with html.parser.
+"""
+
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Optional C-accelerated parsers
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_html = None
+    lxml_etree = None
+
+try:
+    from bs4 import BeautifulSoup, SoupStrainer
+except ImportError:
+    BeautifulSoup = None
+    SoupStrainer = None
+
+# Per-thread lxml parsers (the sweeps parse from several worker threads)
+_lxml_local = threading.local()
+
+# CSS class of a channel post and of its text on t.me/s/ pages
+POST_CLASS = "tgme_widget_message"
+POST_TEXT_CLASS = "tgme_widget_message_text"
+
+
+def _post_id(data_post):
+    """Get the numeric id from a data-post attribute like "channel/123" """
+    try:
+        return int(data_post.rsplit('/', 1)[-1])
+    except (AttributeError, ValueError):
+        return None
+
+
+class SelectolaxBackend:
+    """Parser backend using selectolax with the Lexbor engine (C)"""
+
+    name = "selectolax"
+
+    def channel_posts(self, html: str) -> List[Tuple[Optional[int], str]]:
+        """
+        Get the posts of a t.me/s/ channel page
+
+        Args:
+            html (str): The page HTML
+
+        Returns:
+            List[Tuple[Optional[int], str]]: (post id, message text) in page order;
+                posts without text are skipped
+        """
+        tree = SelectolaxParser(html)
+        posts = []
+        for node in tree.css(f".{POST_CLASS}[data-post]"):
+            text_node = node.css_first(f".{POST_TEXT_CLASS}")
+            if text_node is not None:
+                posts.append((_post_id(node.attributes.get('data-post')), text_node.text()))
+        return posts
+
+    def link_hrefs(self, html: str) -> List[str]:
+        """Get the href values of all <a> elements"""
+        tree = SelectolaxParser(html)
+        return [node.attributes['href'] for node in tree.css("a[href]") if node.attributes.get('href')]
+
+    def text_content(self, html: str) -> str:
+        """Get the text of the page"""
+        tree = SelectolaxParser(html)
+        root = tree.body or tree.root
+        return root.text(separator=' ') if root is not None else ""
+
+
+class LxmlBackend:
+    """Parser backend using lxml (libxml2, C)"""
+
+    name = "lxml"
+
+    # XPath class tests matching a single class among several
+    _POST_XPATH = f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {POST_CLASS} ') and @data-post]"
+    _TEXT_XPATH = f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {POST_TEXT_CLASS} ')]"
+
+    @staticmethod
+    def _parse(html: str):
+        """
+        Parse a document, or get None if there is nothing to parse
+
+        lxml refuses a str with an XML encoding declaration (ValueError), so the text
+        is passed as UTF-8 bytes with the encoding forced; an empty document raises
+        ParserError.
+        """
+        try:
+            return lxml_html.fromstring(html.encode('utf-8'), parser=LxmlBackend._parser())
+        except (lxml_etree.ParserError, ValueError):
+            return None
+
+    @staticmethod
+    def _parser():
+        """The UTF-8 HTML parser (lxml parsers are not thread-safe, so one per thread)"""
+        parser = getattr(_lxml_local, 'parser', None)
+        if parser is None:
+            parser = _lxml_local.parser = lxml_html.HTMLParser(encoding='utf-8')
+        return parser
+
+    def channel_posts(self, html: str) -> List[Tuple[Optional[int], str]]:
+        """Get the posts of a t.me/s/ channel page (see SelectolaxBackend.channel_posts)"""
+        root = self._parse(html)
+        if root is None:
+            return []
+        posts = []
+        for node in root.xpath(self._POST_XPATH):
+            text_nodes = node.xpath(self._TEXT_XPATH)
+            if text_nodes:
+                posts.append((_post_id(node.get('data-post')), text_nodes[0].text_content()))
+        return posts
+
+    def link_hrefs(self, html: str) -> List[str]:
+        """Get the href values of all <a> elements"""
+        root = self._parse(html)
+        if root is None:
+            return []
+        return [href for href in root.xpath("//a/@href") if href]
+
+    def text_content(self, html: str) -> str:
+        """Get the text of the page"""
+        root = self._parse(html)
+        return root.text_content() if root is not None else ""
+
+
+class BeautifulSoupBackend:
+    """
+    Parser backend using BeautifulSoup with html.parser (pure Python)
+
+    SoupStrainer limits each parse to the elements that are needed, so no tree
+    of the whole document is built.
+    """
+
+    name = "bs4"
+
+    def channel_posts(self, html: str) -> List[Tuple[Optional[int], str]]:
+        """Get the posts of a t.me/s/ channel page (see SelectolaxBackend.channel_posts)"""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(attrs={'data-post': True}))
+        posts = []
+        for node in soup.find_all(attrs={'data-post': True}, class_=POST_CLASS):
+            text_node = node.find(class_=POST_TEXT_CLASS)
+            if text_node is not None:
+                posts.append((_post_id(node.get('data-post')), text_node.get_text()))
+        return posts
+
+    def link_hrefs(self, html: str) -> List[str]:
+        """Get the href values of all <a> elements"""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('a', href=True))
+        return [a_tag['href'] for a_tag in soup.find_all('a', href=True)]
+
+    def text_content(self, html: str) -> str:
+        """Get the text of the page"""
+        return BeautifulSoup(html, 'html.parser').get_text()
+
+
+# Backends in order of preference, with whether their library is installed
+BACKENDS = {
+    SelectolaxBackend.name: (SelectolaxBackend, SelectolaxParser is not None),
+    LxmlBackend.name: (LxmlBackend, lxml_html is not None),
+    BeautifulSoupBackend.name: (BeautifulSoupBackend, BeautifulSoup is not None),
+}
+
+
+def available_backends() -> List[str]:
+    """Get the names of the backends whose library is installed, fastest first"""
+    return [name for name, (_, installed) in BACKENDS.items() if installed]
+
+
+def get_parser(name: Optional[str] = None):
+    """
+    Get an HTML parser backend
+
+    Args:
+        name (str, optional): "selectolax", "lxml" or "bs4". Defaults to the
+            HTML_PARSER_BACKEND environment variable, then the fastest installed backend.
+
+    Returns:
+        The parser backend
+    """
+    name = name or os.environ.get("HTML_PARSER_BACKEND")
+    if name:
+        backend_class, installed = BACKENDS.get(name, (None, False))
+        if installed:
+            return backend_class()
+        logger.warning(f"HTML parser backend '{name}' is not available, using the default")
+
+    for backend_name in available_backends():
+        return BACKENDS[backend_name][0]()
+    raise ImportError("No HTML parser available; install selectolax, lxml or beautifulsoup4")
+
+
+def _sample_channel_page(post_count: int = 20) -> str:
+    """Build a synthetic t.me/s/ channel page"""
+    posts = []
+    for i in range(post_count):
+        posts.append(
+            f'<div class="tgme_widget_message_wrap js-widget_message_wrap">'
+            f'<div class="tgme_widget_message text_not_supported_wrap js-widget_message" data-post="sample/{1000 + i}">'
+            f'<div class="tgme_widget_message_bubble"><div class="tgme_widget_message_author">'
+            f'<a class="tgme_widget_message_owner_name" href="https://t.me/sample"><span>Sample</span></a></div>'
+            f'<div class="tgme_widget_message_text js-message_text" dir="auto">'
+            f'لینک گروه جدید <a href="https://t.me/+AbCdEf{i}">عضویت</a><br/>'
+            f'کانال فیلم و سریال <a href="https://t.me/movies_{i}">@movies_{i}</a></div>'
+            f'<div class="tgme_widget_message_footer"><span class="tgme_widget_message_views">{i}K</span>'
+            f'<a class="tgme_widget_message_date" href="https://t.me/sample/{1000 + i}">'
+            f'<time datetime="2024-01-01T00:00:00+00:00">00:00</time></a></div></div></div></div>'
+        )
+    return ('<!DOCTYPE html><html><head><title>Sample</title></head><body>'
+            '<main class="tgme_main"><section class="tgme_channel_history js-message_history">'
+            + "".join(posts) + '</section></main></body></html>')
+
+
+# Benchmark: python html_parsing.py [saved_page.html ...]
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                pages.append(f.read())
+    else:
+        pages = [_sample_channel_page(20) for _ in range(10)]
+
+    rounds = 20
+    full_soup = ("bs4 full tree (old)", lambda page: [
+        node.get_text() for node in BeautifulSoup(page, 'html.parser').select(f'.{POST_TEXT_CLASS}')
+    ]) if BeautifulSoup is not None else None
+
+    candidates = [(name, get_parser(name).channel_posts) for name in available_backends()]
+    if full_soup:
+        candidates.append(full_soup)
+
+    print(f"{len(pages)} pages x {rounds} rounds")
+    for name, parse in candidates:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                parse(page)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20} | {len(pages) * rounds / elapsed:8.1f} pages/s")
@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+
+class CacheResult:
+    """
+    Outcome of a cached fetch
+
+    A fetched page is not recorded in the cache until commit() is called, so a
+    caller that fails before it has stored the page's links sees the page as
+    changed again on the next fetch instead of skipping it.
+    """
+
+    def __init__(self, url, status_code, text, changed, cache_status, store=None):
+        """
+        Args:
+            url (str): The requested URL
+            status_code (int): HTTP status of the response (304 for a conditional hit)
+            text (str): The page body; the cached body for a 304 if one is stored
+            changed (bool): Whether the page differs from the cached copy
+            cache_status (str): "not_modified", "unchanged", "changed" or "uncached"
+            store (callable, optional): Records the response in the cache; run by commit()
+        """
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.changed = changed
+        self.cache_status = cache_status
+        self._store = store
+
+    @property
+    def pending(self):
+        """Whether the response still has to be committed"""
+        return self._store is not None
+
+    def commit(self):
+        """Record the response in the cache (call once the page has been processed)"""
+        store, self._store = self._store, None
+        if store is not None:
+            store()
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache for the scrapers, keyed by URL
+
+    For each URL the cache keeps the ETag, Last-Modified and a hash of the body,
+    plus the body itself. Fetches send If-None-Match / If-Modified-Since, and a
+    page is reported unchanged when the server answers 304 or returns a body
+    with the same hash, so callers can skip parsing it. The least recently used
+    entries are evicted once the cache grows beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir="cache/http", max_bytes=50 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir (str): Directory holding the cache entries
+            max_bytes (int): Size of the stored bodies above which old entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index = None   # Entry key to (size, last access time), loaded lazily
+        self._lock = threading.Lock()
+
+    def sweep(self, name):
+        """
+        Start a sweep: a group of fetches whose hit rate is reported together
+
+        Args:
+            name (str): Name used when the sweep's statistics are logged
+
+        Returns:
+            HttpCacheSweep: Object to fetch through during the sweep
+        """
+        return HttpCacheSweep(self, name)
+
+    def fetch(self, url, session=None, timeout=10, headers=None):
+        """
+        Fetch a URL with a conditional GET
+
+        Args:
+            url (str): The URL to fetch
+            session: requests session to use; defaults to the requests module
+            timeout (int): Request timeout in seconds
+            headers (dict, optional): Extra request headers
+
+        Returns:
+            CacheResult: The response and whether it changed since the last fetch; commit()
+                it after processing the page so the next fetch can skip it
+        """
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        meta = self._read_meta(key)
+
+        request_headers = dict(headers or {})
+        if meta.get('etag'):
+            request_headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta:
+            self._touch(key)
+            return CacheResult(url, 304, self._read_body(key), False, "not_modified")
+
+        if response.status_code != 200:
+            return CacheResult(url, response.status_code, response.text, True, "uncached")
+
+        text = response.text
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        unchanged = meta.get('content_hash') == content_hash
+
+        def store():
+            self._store(key, url, response.headers, content_hash, text, write_body=not unchanged)
+
+        if unchanged:
+            return CacheResult(url, 200, text, False, "unchanged", store)
+        return CacheResult(url, 200, text, True, "changed", store)
+
+    def _path(self, key, suffix):
+        """Get the file path of a cache entry part"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{suffix}")
+
+    def _read_meta(self, key):
+        """Read the metadata of an entry (empty if it is not cached)"""
+        try:
+            with open(self._path(key, 'json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_body(self, key):
+        """Read the stored body of an entry (None if it was evicted)"""
+        try:
+            with open(self._path(key, 'body'), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store(self, key, url, response_headers, content_hash, text, write_body=True):
+        """Write an entry's metadata (and body) and evict old entries if needed"""
+        os.makedirs(os.path.dirname(self._path(key, 'json')), exist_ok=True)
+
+        body_path = self._path(key, 'body')
+        if write_body or not os.path.exists(body_path):
+            tmp_path = f"{body_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, body_path)
+
+        meta = {
+            'url': url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'content_hash': content_hash,
+            'stored_at': time.time()
+        }
+        tmp_path = f"{self._path(key, 'json')}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path(key, 'json'))
+
+        with self._lock:
+            index = self._load_index()
+            index[key] = (os.path.getsize(body_path), time.time())
+            self._evict(index)
+
+    def _touch(self, key):
+        """Mark an entry as recently used"""
+        with self._lock:
+            index = self._load_index()
+            if key in index:
+                index[key] = (index[key][0], time.time())
+
+    def _load_index(self):
+        """Build the size/access index from the cache directory (called with the lock held)"""
+        if self._index is None:
+            self._index = {}
+            if os.path.isdir(self.cache_dir):
+                for root, _, files in os.walk(self.cache_dir):
+                    for name in files:
+                        if name.endswith('.body'):
+                            stat = os.stat(os.path.join(root, name))
+                            self._index[name[:-len('.body')]] = (stat.st_size, stat.st_mtime)
+        return self._index
+
+    def _evict(self, index):
+        """Remove least recently used entries until the cache fits (called with the lock held)"""
+        total = sum(size for size, _ in index.values())
+        if total <= self.max_bytes:
+            return
+
+        # Evict down to 90% of the limit so we don't evict on every store
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for key, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total <= target:
+                break
+            for suffix in ('body', 'json'):
+                try:
+                    os.remove(self._path(key, suffix))
+                except OSError:
+                    pass
+            del index[key]
+            total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} HTTP cache entries ({total} bytes kept)")
+
+
+class HttpCacheSweep:
+    """Fetches made through an HttpCache during one sweep, with hit statistics"""
+
+    def __init__(self, cache, name):
+        self.cache = cache
+        self.name = name
+        self.counts = {"not_modified": 0, "unchanged": 0, "changed": 0, "uncached": 0}
+        self._pending = {}   # URL to the fetched result not committed yet
+        self._lock = threading.Lock()
+
+    def fetch(self, url, session=None, timeout=10, headers=None):
+        """Fetch a URL through the cache and count the outcome (see HttpCache.fetch)"""
+        result = self.cache.fetch(url, session=session, timeout=timeout, headers=headers)
+        with self._lock:
+            self.counts[result.cache_status] += 1
+            if result.pending:
+                self._pending[url] = result
+        return result
+
+    def commit(self, url=None):
+        """
+        Record fetched pages in the cache once their links are stored
+
+        Args:
+            url (str, optional): The page to commit; all pending pages if omitted
+
+        Returns:
+            int: Number of pages committed
+        """
+        with self._lock:
+            if url is None:
+                results = list(self._pending.values())
+                self._pending.clear()
+            else:
+                result = self._pending.pop(url, None)
+                results = [result] if result else []
+        for result in results:
+            result.commit()
+        return len(results)
+
+    def discard(self, url):
+        """Forget a fetched page without committing it, so the next sweep processes it again"""
+        with self._lock:
+            self._pending.pop(url, None)
+
+    def stats(self):
+        """
+        Get the sweep's cache statistics
+
+        Returns:
+            dict: Counts per outcome, total requests and hit rate (304s and unchanged bodies)
+        """
+        with self._lock:
+            counts = dict(self.counts)
+        requests_made = sum(counts.values())
+        hits = counts["not_modified"] + counts["unchanged"]
+        counts['requests'] = requests_made
+        counts['hit_rate'] = hits / requests_made if requests_made else 0.0
+        return counts
+
+    def log_stats(self):
+        """Log the sweep's cache statistics"""
+        stats = self.stats()
+        if stats['requests']:
+            logger.info(f"HTTP cache ({self.name}): {stats['requests']} requests, "
+                        f"{stats['not_modified']} not modified, {stats['unchanged']} unchanged, "
+                        f"{stats['changed']} changed, hit rate {stats['hit_rate']:.0%}")
+        return stats
+
+
+# Shared cache used by the scrapers
+http_cache = HttpCache()
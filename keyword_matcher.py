@@ -0,0 +1,175 @@
+"""
+Multi-keyword matcher used for category and linkdoni detection.
+
+All keywords are compiled into one trie-shaped regular expression, so a single
+scan of the text finds every keyword it contains, instead of one substring
+search per keyword.
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List, Set
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a regex alternation shaped like a trie of the keywords
+
+    Shared prefixes are factored out so the regex engine only follows the branches
+    that can still match, and at each node longer continuations are tried before
+    ending, so the match at a position is always the longest keyword starting there.
+
+    Args:
+        keywords (Iterable[str]): Non-empty keywords
+
+    Returns:
+        str: The regex pattern
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True  # End of a keyword
+
+    def build(node):
+        is_end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        pattern = '(?:' + '|'.join(branches) + ')'
+        return pattern + '?' if is_end else pattern
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Finds which of a fixed set of keywords occur in a text, in a single pass"""
+
+    def __init__(self, keyword_groups: Dict[str, List[str]]):
+        """
+        Compile the matcher
+
+        Args:
+            keyword_groups (Dict[str, List[str]]): Group name (e.g. category) to its keywords.
+                Matching is case-insensitive; a keyword listed twice counts twice.
+        """
+        # Keep the group order, score() ties are resolved by it
+        self.groups = {group: [keyword.lower() for keyword in keywords]
+                       for group, keywords in keyword_groups.items()}
+
+        # Keyword to the groups it counts for, once per listing
+        self._keyword_groups = {}
+        for group, keywords in self.groups.items():
+            for keyword in keywords:
+                self._keyword_groups.setdefault(keyword, []).append(group)
+
+        keywords = set(self._keyword_groups)
+        keywords.discard('')  # An empty keyword is contained in every text
+
+        # The regex reports only the longest keyword starting at each position;
+        # any shorter keyword starting there is one of its prefixes
+        self._prefixes = {
+            keyword: [other for other in keywords if keyword.startswith(other)]
+            for keyword in keywords
+        }
+
+        self._pattern = re.compile(_trie_pattern(keywords)) if keywords else None
+
+    def find(self, text: str, lowered: bool = False) -> Set[str]:
+        """
+        Get the keywords contained in a text
+
+        Args:
+            text (str): The text to search
+            lowered (bool): Whether the text is already lowercase
+
+        Returns:
+            Set[str]: The matched keywords (lowercase)
+        """
+        found = {''}
+        if not text or self._pattern is None:
+            return found
+
+        if not lowered:
+            text = text.lower()
+
+        # Restart one character after each match start so overlapping keywords are
+        # found too; between matches search() skips ahead using the set of first characters
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            found.update(self._prefixes[match.group()])
+            match = search(text, match.start() + 1)
+        return found
+
+    def score(self, text: str, lowered: bool = False) -> Dict[str, int]:
+        """
+        Count, for each group, how many of its keywords occur in a text
+
+        Args:
+            text (str): The text to search
+            lowered (bool): Whether the text is already lowercase
+
+        Returns:
+            Dict[str, int]: Group name to number of matched keywords, in group order
+        """
+        scores = dict.fromkeys(self.groups, 0)
+        for keyword in self.find(text, lowered):
+            for group in self._keyword_groups.get(keyword, ()):
+                scores[group] += 1
+        return scores
+
+
+def _legacy_score(keyword_groups: Dict[str, List[str]], text: str) -> Dict[str, int]:
+    """The previous per-keyword substring scan, kept only as the benchmark baseline"""
+    text = text.lower()
+    scores = {group: 0 for group in keyword_groups}
+    for group, keywords in keyword_groups.items():
+        for keyword in keywords:
+            if keyword.lower() in text:
+                scores[group] += 1
+    return scores
+
+
+# Benchmark: python keyword_matcher.py [messages.txt]
+# The corpus file holds one channel message per line; without one a synthetic corpus is used.
+if __name__ == "__main__":
+    import random
+    import sys
+    import tempfile
+    import os
+    from link_manager import LinkManager
+
+    # A throwaway data file so the default keywords are used and nothing is written
+    category_keywords = LinkManager(data_file=os.path.join(tempfile.mkdtemp(), "bench.json")).category_keywords
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            messages = [line.strip() for line in f if line.strip()]
+    else:
+        random.seed(0)
+        vocabulary = [keyword for keywords in category_keywords.values() for keyword in keywords]
+        filler = "سلام دوستان عزیز امروز یک مطلب جالب داریم لطفا عضو شوید و به اشتراک بگذارید".split()
+        messages = []
+        for _ in range(2000):
+            words = random.choices(filler, k=60) + random.choices(vocabulary, k=5)
+            random.shuffle(words)
+            messages.append(" ".join(words) + " https://t.me/example_channel")
+
+    matcher = KeywordMatcher(category_keywords)
+    mismatches = sum(1 for message in messages
+                     if matcher.score(message) != _legacy_score(category_keywords, message))
+
+    for label, run in (("legacy substring scan", lambda m: _legacy_score(category_keywords, m)),
+                       ("KeywordMatcher", matcher.score)):
+        start = time.perf_counter()
+        for message in messages:
+            run(message)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} | {len(messages)} messages | {elapsed * 1000:8.1f} ms | "
+              f"{len(messages) / elapsed:9.0f} messages/s")
+
+    print(f"Score mismatches against the legacy scan: {mismatches}")
@@ -0,0 +1,160 @@
+import queue
+import threading
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+
+class _Callback:
+    """Queue marker carrying a put()'s on_stored and on_lost callbacks"""
+
+    __slots__ = ('on_stored', 'on_lost')
+
+    def __init__(self, on_stored, on_lost):
+        self.on_stored = on_stored
+        self.on_lost = on_lost
+
+
+class LinkIngestionQueue:
+    """
+    Buffered hand-off of links found by event handlers to the LinkManager
+
+    Event handlers run on the asyncio loop and must not block it, so they only
+    put (source, links) on a queue. A background thread drains the queue and
+    stores whatever has arrived with one add_links_bulk call per source, either
+    every flush_interval seconds or as soon as max_batch links are waiting.
+    """
+
+    def __init__(self, link_manager, flush_interval=2.0, max_batch=200, max_pending=10000):
+        """
+        Initialize the queue (the flusher thread starts on the first put)
+
+        Args:
+            link_manager: The LinkManager links are stored in
+            flush_interval (float): Longest time in seconds a link waits before being stored
+            max_batch (int): Number of waiting links that triggers an immediate flush
+            max_pending (int): Links buffered at most; further links are dropped and logged
+        """
+        self.link_manager = link_manager
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.stats = {'received': 0, 'stored': 0, 'new': 0, 'dropped': 0}
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._batch_ready = threading.Event()
+        self._flusher = None
+        self._start_lock = threading.Lock()
+
+    def put(self, source, link_items, on_stored=None, on_lost=None):
+        """
+        Queue links for storage without blocking
+
+        Callbacks run in queue order, so on_stored also means that every link
+        queued before these ones has been handled.
+
+        Args:
+            source (str): Name of the group or channel the links came from
+            link_items (list): (link, message_text) pairs; may be empty to only
+                get on_stored once the links queued so far are stored
+            on_stored (callable, optional): Called on the flusher thread once all of
+                these links are stored
+            on_lost (callable, optional): Called instead if any of them was dropped
+                because the queue was full, or could not be stored
+
+        Returns:
+            bool: False if the queue was full and links were dropped
+        """
+        self._ensure_flusher()
+        complete = True
+        for item in link_items:
+            try:
+                self._queue.put_nowait((source, item))
+                self.stats['received'] += 1
+            except queue.Full:
+                complete = False
+                self.stats['dropped'] += 1
+                logger.warning(f"Link ingestion queue full, dropped link from {source}")
+        if complete and (on_stored is not None or on_lost is not None):
+            # Queued behind the links, so it is reached once they have all been drained
+            try:
+                self._queue.put_nowait((source, _Callback(on_stored, on_lost)))
+            except queue.Full:
+                complete = False
+        if not complete and on_lost is not None:
+            self._run_callbacks([_Callback(None, on_lost)], 'on_lost')
+        if self._queue.qsize() >= self.max_batch:
+            self._batch_ready.set()
+        return complete
+
+    def flush(self):
+        """
+        Store every queued link now
+
+        Returns:
+            int: Number of links stored
+        """
+        by_source = {}
+        callbacks = []
+        count = 0
+        while True:
+            try:
+                source, item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Callback):
+                callbacks.append(item)
+                continue
+            by_source.setdefault(source, []).append(item)
+            count += 1
+
+        if not by_source:
+            self._run_callbacks(callbacks, 'on_stored')
+            return 0
+
+        try:
+            with self.link_manager.batch():
+                for source, items in by_source.items():
+                    for link, is_new in self.link_manager.add_links_bulk(items, channel=source):
+                        if is_new:
+                            self.stats['new'] += 1
+                            logger.info(f"New link from {source} (live): {link}")
+        except Exception:
+            self.stats['dropped'] += count
+            self._run_callbacks(callbacks, 'on_lost')
+            raise
+        self.stats['stored'] += count
+        logger.debug(f"Stored {count} streamed links from {len(by_source)} sources")
+        self._run_callbacks(callbacks, 'on_stored')
+        return count
+
+    @staticmethod
+    def _run_callbacks(callbacks, kind):
+        """Run the on_stored or on_lost callbacks of a set of put() calls"""
+        for callback in callbacks:
+            func = getattr(callback, kind)
+            if func is None:
+                continue
+            try:
+                func()
+            except Exception as e:
+                logger.error(f"Error in link ingestion {kind} callback: {str(e)}")
+
+    def _ensure_flusher(self):
+        """Start the background flusher thread if it is not running"""
+        if self._flusher is not None:
+            return
+        with self._start_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="link-ingestion", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        """Flush periodically, or early when a full batch is waiting"""
+        while True:
+            self._batch_ready.wait(self.flush_interval)
+            self._batch_ready.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error storing streamed links: {str(e)}")
@@ -1,10 +1,15 @@
-import json
+import atexit
 import os
 import re
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
+from functools import wraps
 from urllib.parse import urlparse, parse_qs
 from logger import get_logger
+from link_store import JsonLinkStore, SQLiteLinkStore, migrate_json_to_sqlite
+from keyword_matcher import KeywordMatcher
 
 # Import pandas for Excel export feature
 try:
@@ -17,6 +22,9 @@ except ImportError:
 # Get module logger
 logger = get_logger(__name__)
 
+# Channel mentions in message text: t.me/[channelname] or @[channelname]
+CHANNEL_MENTION_PATTERN = re.compile(r'(?:https?://)?t\.me/([a-zA-Z0-9_]+)|@([a-zA-Z0-9_]+)')
+
 # SMS Notification settings
 SMS_NOTIFICATION_SETTINGS = {
     "enabled": False,
@@ -25,25 +33,57 @@ SMS_NOTIFICATION_SETTINGS = {
     "twilio_configured": False
 }
 
+def _locked(method):
+    """Run a LinkManager method while holding the instance lock"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class LinkManager:
     """Manages link extraction, storage, and monitoring of channels"""
     
-    def __init__(self, data_file="links_data.json"):
+    def __init__(self, data_file="links_data.json", storage_backend="json", db_file=None, save_delay_ms=500):
+        """
+        Initialize the link manager
+        
+        Args:
+            data_file (str, optional): JSON snapshot file. Defaults to "links_data.json".
+            storage_backend (str, optional): "json" or "sqlite". Defaults to "json".
+            db_file (str, optional): SQLite database file, used by the "sqlite" backend.
+                Defaults to the data file name with a .db extension.
+            save_delay_ms (int, optional): Minimum time between two background saves.
+                0 saves synchronously on every change. Defaults to 500.
+        """
         self.data_file = data_file
+        
+        # Serializes writers (collectors, scheduler jobs and request handlers all
+        # share one instance). Readers don't take it; they get copies instead.
+        self._lock = threading.RLock()
+        self.store = self._create_store(storage_backend, db_file)  # Storage for links and link counts
+        
+        # Write-behind persistence: save_data() only marks the data dirty and a
+        # background thread writes it out, at most once per save delay
+        self.save_delay = save_delay_ms / 1000.0
+        self._dirty = False
+        self._dirty_event = threading.Event()
+        self._save_lock = threading.Lock()
+        self._persister = None
+        
         self.channels = []  # List of channels to monitor
         self.websites = []  # List of websites to crawl for links
-        self.links = []     # List of all links (history)
-        self.new_links = [] # List of new links (current session)
         self.channel_categories = {}  # Dictionary mapping channel names to categories
         self.website_categories = {}  # Dictionary mapping website URLs to categories
-        self.links_by_category = {}   # Dictionary mapping categories to links
-        self.channel_link_counts = {} # Dictionary to track link count per channel
-        self.website_link_counts = {} # Dictionary to track link count per website
         self.auto_discover = True     # Auto-discover new link-sharing channels
         self.check_message_count = 10 # Number of recent messages to check per channel
         self.scroll_count = 5         # Number of times to scroll website pages
         self.telegram_tokens = []     # List of Telegram bot tokens to use in rotation
         self.current_token_index = 0  # Current index for token rotation
+        self.channel_last_message_ids = {}  # Dictionary mapping channel names to the newest post id processed
+        self.chat_cache = {}          # Dictionary mapping channel names to their cached getChat answer
+        self.chat_cache_ttl = 6 * 3600          # Seconds a getChat answer is reused
+        self.chat_not_found_ttl = 3600          # Seconds a "chat not found" answer is reused
         
         # Default categories
         self.default_categories = ["عمومی", "سرگرمی", "فیلم", "موسیقی", "علمی", "خبری", "ورزشی", "آموزشی", "لینکدونی"]
@@ -100,106 +140,183 @@ class LinkManager:
         
         # Load data from file if exists
         self.load_data()
+        
+        # Compiled matchers over category_keywords and linkdoni_keywords,
+        # rebuilt whenever the keywords change
+        self._category_matcher = KeywordMatcher(self.category_keywords)
+        self._linkdoni_matcher = KeywordMatcher({"لینکدونی": self.linkdoni_keywords})
+        
+        # Write out any pending changes when the process exits
+        atexit.register(self.flush)
+    
+    def _create_store(self, storage_backend, db_file):
+        """Create the storage backend selected at construction"""
+        if storage_backend == "sqlite":
+            db_file = db_file or f"{os.path.splitext(self.data_file)[0]}.db"
+            
+            # One-shot import of the existing JSON data into a fresh database
+            if os.path.exists(self.data_file) and not os.path.exists(db_file):
+                migrate_json_to_sqlite(self.data_file, db_file)
+                
+            logger.info(f"Using SQLite link storage: {db_file}")
+            return SQLiteLinkStore(db_file)
+            
+        if storage_backend != "json":
+            logger.warning(f"Unknown storage backend '{storage_backend}', using JSON storage")
+        return JsonLinkStore(self.data_file)
     
+    @_locked
     def load_data(self):
-        """Load data from JSON file if it exists"""
+        """Load settings and links from the storage backend"""
         global SMS_NOTIFICATION_SETTINGS
         
-        if os.path.exists(self.data_file):
+        if self.store.exists():
             try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.channels = data.get('channels', [])
-                    self.websites = data.get('websites', [])  # Load websites list
-                    self.links = data.get('links', [])
-                    self.new_links = data.get('new_links', [])
-                    self.channel_categories = data.get('channel_categories', {})
-                    self.website_categories = data.get('website_categories', {})  # Load website categories
-                    self.links_by_category = data.get('links_by_category', {})
-                    self.check_interval = data.get('check_interval', 5)
-                    self.last_check = data.get('last_check')
-                    self.telegram_token = data.get('telegram_token')
-                    self.telegram_tokens = data.get('telegram_tokens', [])
-                    self.current_token_index = data.get('current_token_index', 0)
-                    self.channel_link_counts = data.get('channel_link_counts', {})
-                    self.website_link_counts = data.get('website_link_counts', {})  # Load website link counts
-                    self.auto_discover = data.get('auto_discover', True)
-                    self.check_message_count = data.get('check_message_count', 10)
-                    self.scroll_count = data.get('scroll_count', 5)  # Load scroll count setting
+                data = self.store.load()
+                self.channels = data.get('channels', [])
+                self.websites = data.get('websites', [])  # Load websites list
+                self.channel_categories = data.get('channel_categories', {})
+                self.website_categories = data.get('website_categories', {})  # Load website categories
+                self.check_interval = data.get('check_interval', 5)
+                self.last_check = data.get('last_check')
+                self.telegram_token = data.get('telegram_token')
+                self.telegram_tokens = data.get('telegram_tokens', [])
+                self.current_token_index = data.get('current_token_index', 0)
+                self.auto_discover = data.get('auto_discover', True)
+                self.check_message_count = data.get('check_message_count', 10)
+                self.scroll_count = data.get('scroll_count', 5)  # Load scroll count setting
+                self.channel_last_message_ids = data.get('channel_last_message_ids', {})  # Load scraping high-water marks
+                self.chat_cache = data.get('chat_cache', {})  # Load cached getChat answers
+                self.chat_cache_ttl = data.get('chat_cache_ttl', self.chat_cache_ttl)
+                self.chat_not_found_ttl = data.get('chat_not_found_ttl', self.chat_not_found_ttl)
+                
+                # Load category keywords from file if available
+                if 'category_keywords' in data:
+                    self.category_keywords = data.get('category_keywords', self.category_keywords)
+                
+                # Load SMS notification settings if available
+                sms_notification_data = data.get('sms_notification', {})
+                if sms_notification_data:
+                    SMS_NOTIFICATION_SETTINGS.update({
+                        'enabled': sms_notification_data.get('enabled', False),
+                        'phone_number': sms_notification_data.get('phone_number'),
+                        'min_links': sms_notification_data.get('min_links', 5)
+                    })
                     
-                    # Load category keywords from file if available
-                    if 'category_keywords' in data:
-                        self.category_keywords = data.get('category_keywords', self.category_keywords)
+                    # Check if Twilio credentials are configured
+                    twilio_sid = os.environ.get("TWILIO_ACCOUNT_SID")
+                    twilio_token = os.environ.get("TWILIO_AUTH_TOKEN")
+                    twilio_phone = os.environ.get("TWILIO_PHONE_NUMBER")
+                    
+                    SMS_NOTIFICATION_SETTINGS['twilio_configured'] = all([
+                        twilio_sid, twilio_token, twilio_phone
+                    ])
+                
+                # If we have a token, set it in the environment
+                if self.telegram_token:
+                    os.environ["TELEGRAM_BOT_TOKEN"] = self.telegram_token
+                    logger.info("Loaded Telegram token from storage")
                     
-                    # Load SMS notification settings if available
-                    sms_notification_data = data.get('sms_notification', {})
-                    if sms_notification_data:
-                        SMS_NOTIFICATION_SETTINGS.update({
-                            'enabled': sms_notification_data.get('enabled', False),
-                            'phone_number': sms_notification_data.get('phone_number'),
-                            'min_links': sms_notification_data.get('min_links', 5)
-                        })
-                        
-                        # Check if Twilio credentials are configured
-                        twilio_sid = os.environ.get("TWILIO_ACCOUNT_SID")
-                        twilio_token = os.environ.get("TWILIO_AUTH_TOKEN")
-                        twilio_phone = os.environ.get("TWILIO_PHONE_NUMBER")
-                        
-                        SMS_NOTIFICATION_SETTINGS['twilio_configured'] = all([
-                            twilio_sid, twilio_token, twilio_phone
-                        ])
+                # Make sure the main token is in the tokens list
+                if self.telegram_token and self.telegram_token not in self.telegram_tokens:
+                    self.telegram_tokens.append(self.telegram_token)
+                    logger.debug("Added main token to the token rotation list")
                     
-                    # If we have a token, set it in the environment
-                    if self.telegram_token:
-                        os.environ["TELEGRAM_BOT_TOKEN"] = self.telegram_token
-                        logger.info("Loaded Telegram token from storage")
-                        
-                    # Make sure the main token is in the tokens list
-                    if self.telegram_token and self.telegram_token not in self.telegram_tokens:
-                        self.telegram_tokens.append(self.telegram_token)
-                        logger.debug("Added main token to the token rotation list")
-                        
-                logger.info(f"Loaded data: {len(self.channels)} channels, {len(self.websites)} websites, {len(self.links)} links, {len(self.new_links)} new links")
+                logger.info(f"Loaded data: {len(self.channels)} channels, {len(self.websites)} websites, {self.store.count_links()} links, {len(self.store.get_new_links())} new links")
             except Exception as e:
                 logger.error(f"Error loading data: {e}")
     
     def save_data(self):
-        """Save data to JSON file"""
+        """
+        Schedule a save of the settings and a full link snapshot
+        
+        The write happens on the background persister thread, so several
+        changes in quick succession are written once. Call flush() to write
+        immediately.
+        """
+        self._dirty = True
+        if self.save_delay <= 0:
+            self.flush()
+            return
+            
+        self._start_persister()
+        self._dirty_event.set()
+    
+    def flush(self):
+        """Write pending changes to storage now"""
+        with self._save_lock:
+            if not self._dirty:
+                return
+            # Clear the event first: a save_data() between these two lines sets it
+            # again, and the snapshot below is taken after its change anyway
+            self._dirty_event.clear()
+            self._dirty = False
+            if not self._write_snapshot():
+                # Keep the data dirty and wake the persister so the write is retried
+                self._dirty = True
+                self._dirty_event.set()
+    
+    def _start_persister(self):
+        """Start the background persister thread if it is not running"""
+        if self._persister is None or not self._persister.is_alive():
+            self._persister = threading.Thread(
+                target=self._persist_loop, name="LinkManagerPersister", daemon=True
+            )
+            self._persister.start()
+    
+    def _persist_loop(self):
+        """Wait for changes and flush them, at most once per save delay"""
+        while True:
+            self._dirty_event.wait()
+            # Let further changes accumulate so they are written together
+            time.sleep(self.save_delay)
+            self.flush()
+    
+    def _write_snapshot(self):
+        """
+        Save a full snapshot to storage (this also compacts the link journal)
+        
+        Returns:
+            bool: True if the snapshot was written
+        """
         try:
             # Get global SMS notification settings
             global SMS_NOTIFICATION_SETTINGS
             
+            # Copies, since request threads may change the settings while we write
             data = {
-                'channels': self.channels,
-                'websites': self.websites,  # Save websites list
-                'links': self.links,
-                'new_links': self.new_links,
-                'channel_categories': self.channel_categories,
-                'website_categories': self.website_categories,  # Save website categories
-                'links_by_category': self.links_by_category,
+                'channels': list(self.channels),
+                'websites': list(self.websites),  # Save websites list
+                'channel_categories': dict(self.channel_categories),
+                'website_categories': dict(self.website_categories),  # Save website categories
                 'check_interval': self.check_interval,
                 'last_check': self.last_check,
                 'telegram_token': self.telegram_token,
-                'telegram_tokens': getattr(self, 'telegram_tokens', []),
+                'telegram_tokens': list(getattr(self, 'telegram_tokens', [])),
                 'current_token_index': getattr(self, 'current_token_index', 0),
-                'channel_link_counts': self.channel_link_counts,
-                'website_link_counts': self.website_link_counts,  # Save website link counts
                 'auto_discover': self.auto_discover,
                 'check_message_count': self.check_message_count,
                 'scroll_count': self.scroll_count,  # Save scroll count setting
-                'category_keywords': self.category_keywords,  # Save category keywords to make them editable
+                'channel_last_message_ids': dict(self.channel_last_message_ids),  # Save scraping high-water marks
+                'chat_cache': dict(self.chat_cache),  # Save cached getChat answers
+                'chat_cache_ttl': self.chat_cache_ttl,
+                'chat_not_found_ttl': self.chat_not_found_ttl,
+                'category_keywords': dict(self.category_keywords),  # Save category keywords to make them editable
                 'sms_notification': {
                     'enabled': SMS_NOTIFICATION_SETTINGS.get('enabled', False),
                     'phone_number': SMS_NOTIFICATION_SETTINGS.get('phone_number'),
                     'min_links': SMS_NOTIFICATION_SETTINGS.get('min_links', 5)
                 }
             }
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # The store adds the links and link counts to the snapshot
+            self.store.save(data)
             logger.info("Data saved successfully")
+            return True
         except Exception as e:
             logger.error(f"Error saving data: {e}")
+            return False
             
+    @_locked
     def set_telegram_token(self, token):
         """Set the Telegram Bot Token"""
         self.telegram_token = token
@@ -218,6 +335,7 @@ class LinkManager:
         logger.info("Telegram token set and saved to storage")
         return True
         
+    @_locked
     def add_telegram_token(self, token):
         """Add another Telegram Bot Token to the rotation"""
         # Initialize token list if it doesn't exist
@@ -237,6 +355,7 @@ class LinkManager:
             return True
         return False
         
+    @_locked
     def remove_telegram_token(self, token):
         """Remove a Telegram Bot Token from the rotation"""
         if not hasattr(self, 'telegram_tokens'):
@@ -255,6 +374,7 @@ class LinkManager:
             return True
         return False
         
+    @_locked
     def get_telegram_token(self):
         """Get the next stored Telegram Bot Token using rotation"""
         # If there are no tokens in the rotation, just return the main token
@@ -277,11 +397,12 @@ class LinkManager:
     def get_all_telegram_tokens(self):
         """Get all stored Telegram Bot Tokens"""
         if hasattr(self, 'telegram_tokens') and self.telegram_tokens:
-            return self.telegram_tokens
+            return list(self.telegram_tokens)
         elif self.telegram_token:
             return [self.telegram_token]
         return []
     
+    @_locked
     def add_channel(self, channel, category="عمومی"):
         """
         Add a channel to monitor with a specific category
@@ -343,6 +464,7 @@ class LinkManager:
             
         return True
     
+    @_locked
     def remove_channel(self, channel):
         """Remove a channel from monitoring"""
         if not channel:
@@ -377,6 +499,8 @@ class LinkManager:
         # Also remove from channel_categories if exists
         if channel in self.channel_categories:
             del self.channel_categories[channel]
+        self.channel_last_message_ids.pop(channel, None)
+        self.chat_cache.pop(channel, None)
         self.save_data()
         
         # Log the normalization if it happened
@@ -387,20 +511,123 @@ class LinkManager:
             
         return True
     
+    @_locked
     def remove_all_channels(self):
         """Remove all channels from monitoring"""
         count = len(self.channels)
         self.channels = []
-        # Clear channel categories as well
+        # Clear channel categories, scraping marks and cached chat info as well
         self.channel_categories = {}
+        self.channel_last_message_ids = {}
+        self.chat_cache = {}
         self.save_data()
         logger.info(f"Removed all {count} channels")
         return count
     
+    def get_channel_last_message_id(self, channel):
+        """
+        Get the id of the newest post already processed for a channel
+        
+        Args:
+            channel (str): The channel name
+            
+        Returns:
+            int: The post id, or None if the channel has not been scraped yet
+        """
+        return self.channel_last_message_ids.get(channel)
+    
+    @_locked
+    def set_channel_last_message_id(self, channel, message_id):
+        """
+        Advance the high-water mark of a channel (it never moves backwards)
+        
+        Args:
+            channel (str): The channel name
+            message_id (int): Id of the newest post processed
+        """
+        if message_id > self.channel_last_message_ids.get(channel, 0):
+            self.channel_last_message_ids[channel] = message_id
+            self.save_data()
+    
+    def get_cached_chat(self, channel):
+        """
+        Get the cached getChat answer for a channel if it is still fresh
+        
+        Args:
+            channel (str): The channel name
+            
+        Returns:
+            dict: The answer in getChat response form, or None if there is no fresh entry
+        """
+        entry = self.chat_cache.get(channel)
+        if not entry:
+            return None
+        
+        ttl = self.chat_not_found_ttl if entry.get('not_found') else self.chat_cache_ttl
+        if time.time() - entry.get('cached_at', 0) >= ttl:
+            return None
+        
+        if entry.get('not_found'):
+            return {"ok": False, "description": entry.get('description', "Chat not found"), "error_code": 400,
+                    "cached": True}
+        return {"ok": True, "result": dict(entry['result']), "cached": True}
+    
+    @_locked
+    def cache_chat(self, channel, chat_info):
+        """
+        Remember a getChat answer for a channel
+        
+        Successful answers and "chat not found" errors are cached; other failures
+        (network errors, rate limits) are not, so the next sweep asks again. Nothing
+        is stored while the TTL for that kind of answer is 0 (cache disabled).
+        
+        Args:
+            channel (str): The channel name
+            chat_info (dict): The getChat response
+        """
+        if chat_info.get('ok'):
+            if self.chat_cache_ttl <= 0:
+                return
+            chat = chat_info.get('result', {})
+            # Only the fields the sweep uses, to keep the settings file small
+            entry = {'result': {key: chat[key] for key in ('id', 'title', 'username', 'type') if key in chat}}
+        elif chat_info.get('error_code') == 400 and 'not found' in chat_info.get('description', '').lower():
+            if self.chat_not_found_ttl <= 0:
+                return
+            entry = {'not_found': True, 'description': chat_info.get('description')}
+        else:
+            return
+        
+        entry['cached_at'] = time.time()
+        self.chat_cache[channel] = entry
+        self.save_data()
+    
+    @_locked
+    def set_chat_cache_ttl(self, seconds, not_found_seconds=None):
+        """
+        Set how long getChat answers are reused
+        
+        Args:
+            seconds (int): TTL of successful answers; 0 disables the cache
+            not_found_seconds (int, optional): TTL of "chat not found" answers; 0 stops caching them
+        """
+        self.chat_cache_ttl = seconds
+        if not_found_seconds is not None:
+            self.chat_not_found_ttl = not_found_seconds
+        
+        # Entries of a disabled kind would never be read again; don't keep them on disk
+        self.chat_cache = {
+            channel: entry for channel, entry in self.chat_cache.items()
+            if (self.chat_not_found_ttl if entry.get('not_found') else self.chat_cache_ttl) > 0
+        }
+        self.save_data()
+        logger.info(f"getChat cache TTL set to {self.chat_cache_ttl}s ({self.chat_not_found_ttl}s for missing chats)")
+    
     def get_channels(self):
         """Get list of monitored channels"""
-        return self.channels
+        return list(self.channels)
         
+    @_locked
     def add_website(self, url, category="عمومی"):
         """
         Add a website to crawl for links with a specific category
@@ -437,6 +664,7 @@ class LinkManager:
         logger.info(f"Added website: {url} with category: {category}")
         return True
     
+    @_locked
     def remove_website(self, url):
         """Remove a website from crawling"""
         # Normalize URL (ensure it has scheme)
@@ -451,37 +679,38 @@ class LinkManager:
         # Also remove from website_categories if exists
         if url in self.website_categories:
             del self.website_categories[url]
-        # Also remove from website_link_counts if exists
-        if url in self.website_link_counts:
-            del self.website_link_counts[url]
+        # Also remove from website link counts if exists
+        self.store.remove_website_count(url)
             
         self.save_data()
         logger.info(f"Removed website: {url}")
         return True
     
+    @_locked
     def remove_all_websites(self):
         """Remove all websites from crawling"""
         count = len(self.websites)
         self.websites = []
         # Clear website categories and counts as well
         self.website_categories = {}
-        self.website_link_counts = {}
+        self.store.clear_website_counts()
         self.save_data()
         logger.info(f"Removed all {count} websites")
         return count
     
     def get_websites(self):
         """Get list of monitored websites"""
-        return self.websites
+        return list(self.websites)
         
     def get_website_categories(self):
         """Get website categories dictionary"""
-        return self.website_categories
+        return dict(self.website_categories)
         
     def get_scroll_count(self):
         """Get the scroll count for websites"""
         return self.scroll_count
         
+    @_locked
     def set_scroll_count(self, count):
         """
         Set the scroll count for website crawling
@@ -508,6 +737,7 @@ class LinkManager:
             logger.error(f"Invalid scroll count value: {count}")
             return False
             
+    @_locked
     def add_website_link(self, link, website_url=None, page_content=None):
         """
         Add a link from a website, similar to add_link but for websites
@@ -533,9 +763,8 @@ class LinkManager:
         
         # Track link count for this website
         if is_new and website_url:
-            if website_url not in self.website_link_counts:
-                self.website_link_counts[website_url] = 0
-            self.website_link_counts[website_url] += 1
+            self.store.increment_website_count(website_url)
+            self._compact_if_needed()
             
         return is_new
     
@@ -578,6 +807,7 @@ class LinkManager:
             
         return link
         
+    @_locked
     def add_link(self, link, channel=None, message_text=None):
         """
         Add a unique link to storage
@@ -599,20 +829,9 @@ class LinkManager:
         is_new = False
         
         # Check if link is already in the history list
-        if link not in self.links:
-            self.links.append(link)
+        if not self.store.has_link(link):
             is_new = True
             
-            # If it's a new link, add it to the new_links list as well
-            if link not in self.new_links:
-                self.new_links.append(link)
-            
-            # Track link count for this channel
-            if channel:
-                if channel not in self.channel_link_counts:
-                    self.channel_link_counts[channel] = 0
-                self.channel_link_counts[channel] += 1
-            
             # Determine the category based on message content and channel
             category = "عمومی"
             
@@ -630,19 +849,66 @@ class LinkManager:
                 # Check if message mentions a linkdoni channel we don't already monitor
                 self._check_for_linkdoni_channels(message_text)
             
-            # Initialize category list if needed
-            if category not in self.links_by_category:
-                self.links_by_category[category] = []
-            
-            # Add to category if not already there
-            if link not in self.links_by_category[category]:
-                self.links_by_category[category].append(link)
-                logger.debug(f"Added link to category '{category}': {link}")
+            # Store the link; this appends to the journal instead of rewriting the whole file
+            self.store.add_link(link, category, channel)
+            logger.debug(f"Added link to category '{category}': {link}")
             
-            self.save_data()
+            self._compact_if_needed()
             logger.info(f"Added new link: {link} in category '{category}'")
         
         return is_new
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group link additions so they are persisted with a single write
+        
+        Links added inside the block are deduplicated, categorized and counted
+        in memory as usual; the storage write happens when the outermost
+        batch exits. Batches can be nested, and batches opened by several
+        threads share the write of whichever one closes last.
+        """
+        with self._lock:
+            self.store.begin_batch()
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.store.commit_batch()
+                self._compact_if_needed()
+    
+    def add_links_bulk(self, items, channel=None, website_url=None):
+        """
+        Add many links with a single storage write
+        
+        Args:
+            items (iterable): Links, either as strings or as (link, message_text) pairs
+            channel (str, optional): The channel source of the links
+            website_url (str, optional): The website source of the links
+            
+        Returns:
+            list: (link, is_new) pairs in input order
+        """
+        results = []
+        with self.batch():
+            for item in items:
+                if isinstance(item, str):
+                    link, message_text = item, None
+                else:
+                    link, message_text = item
+                    
+                if website_url:
+                    is_new = self.add_website_link(link, website_url, message_text)
+                else:
+                    is_new = self.add_link(link, channel=channel, message_text=message_text)
+                results.append((link, is_new))
+        return results
+    
+    def _compact_if_needed(self):
+        """Fold the link journal into a new snapshot once it has grown large enough"""
+        if self.store.needs_compaction() and not self._dirty:
+            logger.info(f"Compacting link journal ({self.store.pending_entries} entries)")
+            self.save_data()
         
     def _check_for_linkdoni_channels(self, text):
         """
@@ -654,27 +920,28 @@ class LinkManager:
         if not self.auto_discover or not text:
             return
             
-        # Look for telegram links to channels
-        # Match patterns like https://t.me/channel_name or @channel_name
-        import re
+        text_lower = text.lower()
         
-        # Look for t.me/[channelname] or @[channelname]
-        matches = re.findall(r'(?:https?://)?t\.me/([a-zA-Z0-9_]+)|@([a-zA-Z0-9_]+)', text.lower())
+        # The message itself is scored once; if it reads like a linkdoni post,
+        # every channel it mentions is a candidate
+        description_is_linkdoni = self._is_linkdoni_description(text_lower)
         
-        # Extract the matched channel names
-        for match in matches:
+        # Look for t.me/[channelname] or @[channelname]
+        seen = set()
+        for match in CHANNEL_MENTION_PATTERN.finditer(text_lower):
             # Either the first or second group will have the channel name
-            channel_name = match[0] or match[1]
+            channel_name = match.group(1) or match.group(2)
             
-            if not channel_name:
+            if not channel_name or channel_name in seen:
                 continue
+            seen.add(channel_name)
                 
             # Skip if this is just a joinchat link
             if channel_name == 'joinchat':
                 continue
                 
             # Check if this might be a linkdoni channel
-            if self._is_linkdoni_channel(channel_name, text):
+            if description_is_linkdoni or self._is_linkdoni_name(channel_name):
                 # Try to add it (will be ignored if already exists)
                 logger.info(f"Auto-discovered potential linkdoni channel: {channel_name}")
                 self.add_channel(channel_name, category="لینکدونی")
@@ -690,28 +957,18 @@ class LinkManager:
         Returns:
             bool: True if likely a linkdoni channel
         """
-        # Check channel name for linkdoni keywords
-        channel_name_lower = channel_name.lower()
+        # First check channel name itself, then the description if provided
+        if self._is_linkdoni_name(channel_name.lower()):
+            return True
+        return bool(description) and self._is_linkdoni_description(description.lower())
         
-        # First check channel name itself
-        for keyword in self.linkdoni_keywords:
-            if keyword.lower() in channel_name_lower:
-                return True
-                
-        # Then check description if provided
-        if description:
-            description_lower = description.lower()
-            
-            keyword_count = 0
-            for keyword in self.linkdoni_keywords:
-                if keyword.lower() in description_lower:
-                    keyword_count += 1
-                    
-            # If at least 2 linkdoni keywords in description, it's likely a linkdoni
-            if keyword_count >= 2:
-                return True
-                
-        return False
+    def _is_linkdoni_name(self, channel_name_lower):
+        """Check if a (lowercase) channel name contains a linkdoni keyword"""
+        return self._linkdoni_matcher.score(channel_name_lower, lowered=True)["لینکدونی"] > 0
+        
+    def _is_linkdoni_description(self, description_lower):
+        """Check if a (lowercase) description contains at least 2 linkdoni keywords"""
+        return self._linkdoni_matcher.score(description_lower, lowered=True)["لینکدونی"] >= 2
         
     def _detect_category_from_keywords(self, text):
         """
@@ -726,18 +983,8 @@ class LinkManager:
         if not text:
             return None
             
-        # Convert text to lowercase for case-insensitive matching
-        text = text.lower()
-        
-        # Count keyword matches for each category
-        category_scores = {category: 0 for category in self.category_keywords.keys()}
-        
-        # Check for keywords in each category
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                # Case insensitive search
-                if keyword.lower() in text:
-                    category_scores[category] += 1
+        # Count keyword matches for each category in a single case-insensitive scan
+        category_scores = self._category_matcher.score(text)
         
         # Find category with the most keyword matches
         max_score = 0
@@ -756,11 +1003,11 @@ class LinkManager:
     
     def get_all_links(self):
         """Get all stored unique links (history)"""
-        return self.links
+        return self.store.get_all_links()
     
     def get_new_links(self):
         """Get only new links from the current session"""
-        return self.new_links
+        return self.store.get_new_links()
         
     def get_links_by_category(self, category=None):
         """
@@ -772,15 +1019,21 @@ class LinkManager:
         Returns:
             dict: Dictionary of category to links list, or list of links for specific category
         """
-        if category:
-            return self.links_by_category.get(category, [])
-        return self.links_by_category
+        return self.store.get_links_by_category(category)
+        
+    def get_link_categories(self):
+        """Get a mapping of each stored link to its category"""
+        return self.store.get_link_categories()
+        
+    def count_links(self):
+        """Get the number of stored links"""
+        return self.store.count_links()
         
     def get_categories(self):
         """Get all available categories"""
         # Return both default categories and any used categories from links
         categories = set(self.default_categories)
-        categories.update(self.links_by_category.keys())
+        categories.update(self.store.get_categories())
         return sorted(list(categories))
         
     def get_category_keywords(self, category=None):
@@ -794,9 +1047,10 @@ class LinkManager:
             dict or list: Dictionary of all category keywords, or list of keywords for specific category
         """
         if category:
-            return self.category_keywords.get(category, [])
-        return self.category_keywords
+            return list(self.category_keywords.get(category, []))
+        return dict(self.category_keywords)
         
+    @_locked
     def update_category_keywords(self, category, keywords):
         """
         Update keywords for a specific category
@@ -810,6 +1064,7 @@ class LinkManager:
         """
         if category in self.category_keywords or category in self.default_categories:
             self.category_keywords[category] = keywords
+            self._category_matcher = KeywordMatcher(self.category_keywords)
             self.save_data()
             logger.info(f"Updated keywords for category '{category}'")
             return True
@@ -817,6 +1072,7 @@ class LinkManager:
             logger.warning(f"Cannot update keywords for unknown category: {category}")
             return False
             
+    @_locked
     def set_channel_category(self, channel, category):
         """
         Set or update category for a channel
@@ -848,6 +1104,7 @@ class LinkManager:
         logger.info(f"Set category '{category}' for channel {channel}")
         return True
         
+    @_locked
     def set_website_category(self, website, category):
         """
         Set or update category for a website
@@ -872,20 +1129,21 @@ class LinkManager:
         logger.info(f"Set category '{category}' for website {website}")
         return True
     
+    @_locked
     def clear_links(self):
         """Clear all stored links"""
-        self.links = []
-        self.new_links = []
-        self.links_by_category = {}  # Clear categorized links too
+        self.store.clear_links()  # Clears categorized links too
         self.save_data()
         logger.info("All links cleared")
         
+    @_locked
     def clear_new_links(self):
         """Clear only the new links list, keeping the history"""
-        self.new_links = []
+        self.store.clear_new_links()
         self.save_data()
         logger.info("New links cleared")
     
+    @_locked
     def set_check_interval(self, minutes):
         """Set the check interval in minutes"""
         self.check_interval = minutes
@@ -896,6 +1154,7 @@ class LinkManager:
         """Get the current check interval"""
         return self.check_interval
     
+    @_locked
     def update_last_check_time(self):
         """Update the last check timestamp"""
         self.last_check = datetime.now().isoformat()
@@ -929,13 +1188,14 @@ class LinkManager:
             return None
             
         try:
-            if category and category in self.links_by_category:
+            category_links = self.store.get_links_by_category(category) if category else []
+            if category_links:
                 # Export links for specific category
-                links_to_export = self.links_by_category[category]
+                links_to_export = category_links
                 sheet_name = f"Links - {category}"
             else:
                 # Export all links
-                links_to_export = self.links
+                links_to_export = self.store.get_all_links()
                 sheet_name = "All Links"
             
             # Create 'exports' directory if it doesn't exist
@@ -990,6 +1250,8 @@ class LinkManager:
             return None
             
         try:
+            new_links = self.store.get_new_links()
+            
             # Create 'exports' directory if it doesn't exist
             os.makedirs('static/exports', exist_ok=True)
             
@@ -1001,9 +1263,9 @@ class LinkManager:
             # Fallback to CSV if pandas fails
             try:
                 # Create a DataFrame for links and export to Excel
-                df = pd.DataFrame({"Link URL": self.new_links})
+                df = pd.DataFrame({"Link URL": new_links})
                 df.to_excel(full_path, index=False, sheet_name="New Links")
-                logger.info(f"Exported {len(self.new_links)} new links to Excel: {full_path}")
+                logger.info(f"Exported {len(new_links)} new links to Excel: {full_path}")
             except Exception as excel_error:
                 # If Excel export fails, try CSV instead
                 logger.warning(f"Excel export failed: {excel_error}, trying CSV format")
@@ -1011,10 +1273,10 @@ class LinkManager:
                 
                 with open(csv_path, 'w', encoding='utf-8') as f:
                     f.write("Link URL\n")  # Header
-                    for link in self.new_links:
+                    for link in new_links:
                         f.write(f"{link}\n")
                 
-                logger.info(f"Exported {len(self.new_links)} new links to CSV: {csv_path}")
+                logger.info(f"Exported {len(new_links)} new links to CSV: {csv_path}")
                 return os.path.basename(csv_path)
             
             return filename_with_timestamp
@@ -0,0 +1,689 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+
+class JsonLinkStore:
+    """
+    Storage engine for collected links backed by a JSON snapshot plus an append-only journal
+
+    New links and counter deltas are appended to the journal as one JSON line each,
+    so the cost of recording a link does not depend on how many links are stored.
+    The journal is folded into the snapshot whenever the snapshot is rewritten, and
+    replayed on top of the snapshot when the data is loaded.
+    """
+
+    def __init__(self, data_file="links_data.json", compact_threshold=1000):
+        """
+        Initialize the store
+
+        Args:
+            data_file (str): Path of the JSON snapshot file
+            compact_threshold (int): Number of journal entries after which a compaction is requested
+        """
+        self.data_file = data_file
+        self.journal_file = f"{data_file}.journal"
+        self.compact_threshold = compact_threshold
+
+        self.links = []               # List of all links (history)
+        self.new_links = []           # List of new links (current session)
+        self.links_by_category = {}   # Dictionary mapping categories to links
+        self.channel_link_counts = {} # Dictionary to track link count per channel
+        self.website_link_counts = {} # Dictionary to track link count per website
+
+        # Hash indexes over the lists above so membership checks are O(1);
+        # the lists keep the insertion order the getters return
+        self._link_index = set()
+        self._new_link_index = set()
+        self._category_index = {}
+
+        self.journal_seq = 0          # Sequence number of the last journal entry written
+        self.pending_entries = 0      # Journal entries written since the last snapshot
+        self._batch_depth = 0         # Nesting depth of open batches
+        self._batch_lines = []        # Journal lines held back until the batch is committed
+
+        # Snapshots may be written from a background thread; this lock keeps a
+        # snapshot and its journal truncation from interleaving with new entries
+        self._lock = threading.RLock()
+
+    def exists(self):
+        """Check whether there is any stored data to load"""
+        return os.path.exists(self.data_file) or os.path.exists(self.journal_file)
+
+    def begin_batch(self):
+        """Start holding back journal writes until the matching commit_batch()"""
+        with self._lock:
+            self._batch_depth += 1
+
+    def commit_batch(self):
+        """Close a batch; the outermost one writes all held-back journal lines at once"""
+        with self._lock:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_lines:
+                lines, self._batch_lines = self._batch_lines, []
+                with open(self.journal_file, 'a', encoding='utf-8') as f:
+                    f.write("".join(lines))
+
+    def load(self):
+        """
+        Load the snapshot and replay the journal on top of it
+
+        Returns:
+            dict: The raw snapshot data (empty if no snapshot exists yet)
+        """
+        data = {}
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        self.links = data.get('links', [])
+        self.new_links = data.get('new_links', [])
+        self.links_by_category = data.get('links_by_category', {})
+        self.channel_link_counts = data.get('channel_link_counts', {})
+        self.website_link_counts = data.get('website_link_counts', {})
+        self.journal_seq = data.get('journal_seq', 0)
+        self.pending_entries = 0
+        self._rebuild_indexes()
+
+        replayed = self._replay_journal()
+        if replayed:
+            logger.info(f"Replayed {replayed} journal entries from {self.journal_file}")
+
+        return data
+
+    def save(self, settings):
+        """
+        Write a full snapshot and truncate the journal
+
+        The snapshot is written to a temporary file and renamed over the old one,
+        so a crash during the write leaves the previous snapshot intact.
+
+        Args:
+            settings (dict): Non-link data to store alongside the links
+        """
+        with self._lock:
+            data = dict(settings)
+            data.update({
+                'links': self.links,
+                'new_links': self.new_links,
+                'links_by_category': self.links_by_category,
+                'channel_link_counts': self.channel_link_counts,
+                'website_link_counts': self.website_link_counts,
+                'journal_seq': self.journal_seq
+            })
+            tmp_file = f"{self.data_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.data_file)
+
+            # Everything in the journal is now part of the snapshot,
+            # including lines still held back by an open batch. A crash before
+            # this point is harmless: replay skips entries up to journal_seq.
+            open(self.journal_file, 'w').close()
+            self._batch_lines = []
+            self.pending_entries = 0
+
+    def needs_compaction(self):
+        """Check whether enough journal entries have accumulated to warrant a new snapshot"""
+        # Never compact in the middle of a batch; the batch would lose its single write
+        return self._batch_depth == 0 and self.pending_entries >= self.compact_threshold
+
+    def has_link(self, link):
+        """Check whether a link is already stored"""
+        return link in self._link_index
+
+    def add_link(self, link, category, channel=None):
+        """
+        Store a new link and journal it
+
+        Args:
+            link (str): The cleaned link
+            category (str): The category to file the link under
+            channel (str, optional): The channel the link was found in
+
+        Returns:
+            bool: True if the link was new, False if it already existed
+        """
+        with self._lock:
+            if link in self._link_index:
+                return False
+
+            entry = {'op': 'link', 'link': link, 'category': category, 'channel': channel}
+            self._apply(entry)
+            self._append(entry)
+            return True
+
+    def increment_website_count(self, website_url):
+        """Count one more new link for a website and journal the delta"""
+        entry = {'op': 'website_count', 'website': website_url}
+        with self._lock:
+            self._apply(entry)
+            self._append(entry)
+
+    def remove_website_count(self, website_url):
+        """Forget the link count of a website (persisted with the next snapshot)"""
+        with self._lock:
+            self.website_link_counts.pop(website_url, None)
+
+    def clear_website_counts(self):
+        """Forget all website link counts (persisted with the next snapshot)"""
+        with self._lock:
+            self.website_link_counts = {}
+
+    def clear_links(self):
+        """Remove all links (persisted with the next snapshot)"""
+        with self._lock:
+            self.links = []
+            self.new_links = []
+            self.links_by_category = {}
+            self._rebuild_indexes()
+
+    def clear_new_links(self):
+        """Empty the new links list (persisted with the next snapshot)"""
+        with self._lock:
+            self.new_links = []
+            self._new_link_index = set()
+
+    # The getters return copies so callers can read them without a lock while
+    # other threads keep adding links; copying a list or dict is atomic under the GIL
+
+    def get_all_links(self):
+        """Get all stored links"""
+        return list(self.links)
+
+    def get_new_links(self):
+        """Get links added in the current session"""
+        return list(self.new_links)
+
+    def get_links_by_category(self, category=None):
+        """Get the links of one category, or the whole category mapping"""
+        if category:
+            return list(self.links_by_category.get(category, []))
+        return {category: list(links) for category, links in list(self.links_by_category.items())}
+
+    def get_categories(self):
+        """Get the categories that contain at least one link"""
+        return list(self.links_by_category.keys())
+
+    def get_link_categories(self):
+        """Get a mapping of each link to its category"""
+        link_categories = {}
+        for category, links in list(self.links_by_category.items()):
+            for link in list(links):
+                link_categories[link] = category
+        return link_categories
+
+    def count_links(self):
+        """Get the number of stored links"""
+        return len(self.links)
+
+    def _apply(self, entry):
+        """Apply a journal entry to the in-memory state"""
+        op = entry.get('op')
+        if op == 'link':
+            link = entry['link']
+            if link in self._link_index:
+                return
+            self.links.append(link)
+            self._link_index.add(link)
+            if link not in self._new_link_index:
+                self.new_links.append(link)
+                self._new_link_index.add(link)
+
+            channel = entry.get('channel')
+            if channel:
+                self.channel_link_counts[channel] = self.channel_link_counts.get(channel, 0) + 1
+
+            category = entry.get('category') or "عمومی"
+            if category not in self.links_by_category:
+                self.links_by_category[category] = []
+                self._category_index[category] = set()
+            if link not in self._category_index[category]:
+                self.links_by_category[category].append(link)
+                self._category_index[category].add(link)
+        elif op == 'website_count':
+            website = entry['website']
+            self.website_link_counts[website] = self.website_link_counts.get(website, 0) + 1
+        else:
+            logger.warning(f"Unknown journal operation: {op}")
+
+    def _rebuild_indexes(self):
+        """Rebuild the hash indexes from the ordered lists"""
+        self._link_index = set(self.links)
+        self._new_link_index = set(self.new_links)
+        self._category_index = {
+            category: set(links) for category, links in self.links_by_category.items()
+        }
+
+    def _append(self, entry):
+        """Append an entry to the journal file"""
+        self.journal_seq += 1
+        entry = dict(entry, seq=self.journal_seq)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        if self._batch_depth:
+            self._batch_lines.append(line)
+        else:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+        self.pending_entries += 1
+
+    def _replay_journal(self):
+        """
+        Re-apply journal entries that are newer than the snapshot
+
+        Returns:
+            int: Number of entries replayed
+        """
+        if not os.path.exists(self.journal_file):
+            return 0
+
+        snapshot_seq = self.journal_seq
+        replayed = 0
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash in the middle of a write can leave a partial last line
+                    logger.warning("Skipping corrupt journal entry")
+                    continue
+
+                seq = entry.get('seq', 0)
+                if seq <= snapshot_seq:
+                    # Already contained in the snapshot
+                    continue
+
+                self._apply(entry)
+                self.journal_seq = max(self.journal_seq, seq)
+                replayed += 1
+
+        self.pending_entries = replayed
+        return replayed
+
+
+class SQLiteLinkStore:
+    """
+    Storage engine for collected links backed by a SQLite database
+
+    Links, monitored channels and websites, categories and per-source link counts
+    live in indexed tables, so lookups, category filters and exports are answered
+    by queries instead of keeping the whole link history in memory.
+    Each thread gets its own connection; the database runs in WAL mode so readers
+    are not blocked by a sweep that is writing. The batch state shared between
+    threads is guarded by the store's own lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS links (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            link TEXT NOT NULL UNIQUE,
+            category TEXT NOT NULL,
+            source TEXT,
+            is_new INTEGER NOT NULL DEFAULT 1,
+            discovered_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_links_category ON links (category, id);
+        CREATE INDEX IF NOT EXISTS idx_links_is_new ON links (is_new, id);
+        CREATE INDEX IF NOT EXISTS idx_links_source ON links (source);
+        CREATE INDEX IF NOT EXISTS idx_links_discovered_at ON links (discovered_at);
+
+        CREATE TABLE IF NOT EXISTS channels (
+            name TEXT PRIMARY KEY,
+            category TEXT,
+            position INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS websites (
+            url TEXT PRIMARY KEY,
+            category TEXT,
+            position INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS categories (
+            name TEXT PRIMARY KEY,
+            keywords TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS source_counts (
+            source_type TEXT NOT NULL,
+            source TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source_type, source)
+        );
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, db_file="links_data.db"):
+        """
+        Initialize the store
+
+        Args:
+            db_file (str): Path of the SQLite database file
+        """
+        self.db_file = db_file
+        self.pending_entries = 0  # Writes are committed immediately, nothing to compact
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+        # Rows held back by an open batch and inserted in one transaction on commit
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_links = {}    # link -> (category, source, discovered_at)
+        self._batch_counts = {}   # (source_type, source) -> count delta
+
+    def _connection(self):
+        """Get the SQLite connection of the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def exists(self):
+        """Check whether there is any stored data to load"""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM settings) + (SELECT COUNT(*) FROM links)"
+        ).fetchone()
+        return row[0] > 0
+
+    def load(self):
+        """
+        Load the non-link data
+
+        Returns:
+            dict: Settings in the same shape as the JSON snapshot, without the links
+        """
+        conn = self._connection()
+        data = {}
+        for key, value in conn.execute("SELECT key, value FROM settings"):
+            data[key] = json.loads(value)
+
+        channel_rows = conn.execute(
+            "SELECT name, category, position FROM channels ORDER BY position"
+        ).fetchall()
+        data['channels'] = [name for name, _, position in channel_rows if position is not None]
+        data['channel_categories'] = {name: category for name, category, _ in channel_rows if category is not None}
+
+        website_rows = conn.execute(
+            "SELECT url, category, position FROM websites ORDER BY position"
+        ).fetchall()
+        data['websites'] = [url for url, _, position in website_rows if position is not None]
+        data['website_categories'] = {url: category for url, category, _ in website_rows if category is not None}
+
+        category_rows = conn.execute("SELECT name, keywords FROM categories").fetchall()
+        if category_rows:
+            data['category_keywords'] = {name: json.loads(keywords) for name, keywords in category_rows}
+
+        return data
+
+    def save(self, settings):
+        """
+        Store the non-link data
+
+        Args:
+            settings (dict): Settings in the same shape as the JSON snapshot
+        """
+        settings = dict(settings)
+        channels = settings.pop('channels', [])
+        channel_categories = settings.pop('channel_categories', {})
+        websites = settings.pop('websites', [])
+        website_categories = settings.pop('website_categories', {})
+        category_keywords = settings.pop('category_keywords', None)
+
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM channels")
+            conn.executemany(
+                "INSERT INTO channels (name, category, position) VALUES (?, ?, ?)",
+                [(name, channel_categories.get(name), position) for position, name in enumerate(channels)]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO channels (name, category, position) VALUES (?, ?, NULL)",
+                list(channel_categories.items())
+            )
+
+            conn.execute("DELETE FROM websites")
+            conn.executemany(
+                "INSERT INTO websites (url, category, position) VALUES (?, ?, ?)",
+                [(url, website_categories.get(url), position) for position, url in enumerate(websites)]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO websites (url, category, position) VALUES (?, ?, NULL)",
+                list(website_categories.items())
+            )
+
+            if category_keywords is not None:
+                conn.execute("DELETE FROM categories")
+                conn.executemany(
+                    "INSERT INTO categories (name, keywords) VALUES (?, ?)",
+                    [(name, json.dumps(keywords, ensure_ascii=False)) for name, keywords in category_keywords.items()]
+                )
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in settings.items()]
+            )
+
+    def needs_compaction(self):
+        """SQLite commits each write in place, so there is never anything to compact"""
+        return False
+
+    def begin_batch(self):
+        """Start holding back link writes until the matching commit_batch()"""
+        with self._lock:
+            self._batch_depth += 1
+
+    def commit_batch(self):
+        """Close a batch; the outermost one inserts all held-back rows in one transaction"""
+        with self._lock:
+            self._batch_depth -= 1
+            if self._batch_depth > 0 or not (self._batch_links or self._batch_counts):
+                return
+
+            links, self._batch_links = self._batch_links, {}
+            counts, self._batch_counts = self._batch_counts, {}
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO links (link, category, source, is_new, discovered_at) VALUES (?, ?, ?, 1, ?)",
+                    [(link, category, source, discovered_at) for link, (category, source, discovered_at) in links.items()]
+                )
+                conn.executemany(
+                    "INSERT INTO source_counts (source_type, source, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT (source_type, source) DO UPDATE SET count = count + excluded.count",
+                    [(source_type, source, delta) for (source_type, source), delta in counts.items()]
+                )
+
+    def has_link(self, link):
+        """Check whether a link is already stored"""
+        with self._lock:
+            if link in self._batch_links:
+                return True
+        row = self._connection().execute("SELECT 1 FROM links WHERE link = ?", (link,)).fetchone()
+        return row is not None
+
+    def add_link(self, link, category, channel=None):
+        """
+        Store a new link
+
+        Args:
+            link (str): The cleaned link
+            category (str): The category to file the link under
+            channel (str, optional): The channel the link was found in
+
+        Returns:
+            bool: True if the link was new, False if it already existed
+        """
+        with self._lock:
+            if self._batch_depth:
+                if self.has_link(link):
+                    return False
+                self._batch_links[link] = (category or "عمومی", channel, datetime.now().isoformat())
+                if channel:
+                    key = ('channel', channel)
+                    self._batch_counts[key] = self._batch_counts.get(key, 0) + 1
+                return True
+
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO links (link, category, source, is_new, discovered_at) VALUES (?, ?, ?, 1, ?)",
+                (link, category or "عمومی", channel, datetime.now().isoformat())
+            )
+            if cursor.rowcount == 0:
+                return False
+            if channel:
+                self._increment_count(conn, 'channel', channel)
+        return True
+
+    def increment_website_count(self, website_url):
+        """Count one more new link for a website"""
+        with self._lock:
+            if self._batch_depth:
+                key = ('website', website_url)
+                self._batch_counts[key] = self._batch_counts.get(key, 0) + 1
+                return
+
+        conn = self._connection()
+        with conn:
+            self._increment_count(conn, 'website', website_url)
+
+    def remove_website_count(self, website_url):
+        """Forget the link count of a website"""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM source_counts WHERE source_type = 'website' AND source = ?", (website_url,)
+            )
+
+    def clear_website_counts(self):
+        """Forget all website link counts"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM source_counts WHERE source_type = 'website'")
+
+    def clear_links(self):
+        """Remove all links"""
+        with self._lock:
+            self._batch_links = {}
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM links")
+
+    def clear_new_links(self):
+        """Mark every link as seen"""
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE links SET is_new = 0 WHERE is_new = 1")
+
+    def get_all_links(self):
+        """Get all stored links"""
+        rows = self._connection().execute("SELECT link FROM links ORDER BY id")
+        return [row[0] for row in rows]
+
+    def get_new_links(self):
+        """Get links added in the current session"""
+        rows = self._connection().execute("SELECT link FROM links WHERE is_new = 1 ORDER BY id")
+        return [row[0] for row in rows]
+
+    def get_links_by_category(self, category=None):
+        """Get the links of one category, or the whole category mapping"""
+        conn = self._connection()
+        if category:
+            rows = conn.execute("SELECT link FROM links WHERE category = ? ORDER BY id", (category,))
+            return [row[0] for row in rows]
+
+        links_by_category = {}
+        for link, link_category in conn.execute("SELECT link, category FROM links ORDER BY id"):
+            links_by_category.setdefault(link_category, []).append(link)
+        return links_by_category
+
+    def get_categories(self):
+        """Get the categories that contain at least one link"""
+        rows = self._connection().execute("SELECT DISTINCT category FROM links")
+        return [row[0] for row in rows]
+
+    def get_link_categories(self):
+        """Get a mapping of each link to its category"""
+        rows = self._connection().execute("SELECT link, category FROM links")
+        return {link: category for link, category in rows}
+
+    def count_links(self):
+        """Get the number of stored links"""
+        return self._connection().execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+    def _increment_count(self, conn, source_type, source):
+        """Increment a per-source link count inside the caller's transaction"""
+        conn.execute(
+            "INSERT INTO source_counts (source_type, source, count) VALUES (?, ?, 1) "
+            "ON CONFLICT (source_type, source) DO UPDATE SET count = count + 1",
+            (source_type, source)
+        )
+
+
+def migrate_json_to_sqlite(json_file="links_data.json", db_file="links_data.db"):
+    """
+    Copy the data of a JSON snapshot (and its journal) into a SQLite database
+
+    The migration only runs against an empty database, so it is safe to call on
+    every start-up.
+
+    Args:
+        json_file (str): Path of the JSON snapshot file
+        db_file (str): Path of the SQLite database file
+
+    Returns:
+        int: Number of links migrated, or 0 if nothing was migrated
+    """
+    source = JsonLinkStore(json_file)
+    if not source.exists():
+        logger.info(f"No JSON data at {json_file}, nothing to migrate")
+        return 0
+
+    target = SQLiteLinkStore(db_file)
+    if target.exists():
+        logger.info(f"SQLite database {db_file} already contains data, skipping migration")
+        return 0
+
+    data = source.load()
+    for key in ('links', 'new_links', 'links_by_category', 'channel_link_counts',
+                'website_link_counts', 'journal_seq'):
+        data.pop(key, None)
+    target.save(data)
+
+    link_categories = source.get_link_categories()
+    new_links = set(source.get_new_links())
+    migrated_at = datetime.now().isoformat()
+
+    conn = target._connection()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO links (link, category, source, is_new, discovered_at) VALUES (?, ?, NULL, ?, ?)",
+            [
+                (link, link_categories.get(link, "عمومی"), 1 if link in new_links else 0, migrated_at)
+                for link in source.get_all_links()
+            ]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO source_counts (source_type, source, count) VALUES (?, ?, ?)",
+            [('channel', channel, count) for channel, count in source.channel_link_counts.items()] +
+            [('website', website, count) for website, count in source.website_link_counts.items()]
+        )
+
+    count = source.count_links()
+    logger.info(f"Migrated {count} links from {json_file} to {db_file}")
+    return count
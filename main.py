@@ -14,6 +14,7 @@ from bulk_sms import BulkSMSSender, get_bulk_sms_sender
 from avalai_api import avalai_client
 from perplexity_api import perplexity_client
 from web_crawler import extract_links_from_websites
+from http_cache import http_cache
 
 # Get application logger
 logger = get_logger(__name__)
@@ -23,13 +24,20 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "default-secret-key-for-development")
 
 # Import the accounts blueprint
-from account_routes import accounts_bp, setup_account_scheduler
+from account_routes import accounts_bp, setup_account_scheduler, account_manager
 
 # Register blueprints
 app.register_blueprint(accounts_bp)
 
-# Initialize the link manager
-link_manager = LinkManager()
+# Initialize the link manager (DATABASE_URL=sqlite:///<file> selects the SQLite backend)
+database_url = os.environ.get("DATABASE_URL", "")
+if database_url.startswith("sqlite:///"):
+    link_manager = LinkManager(storage_backend="sqlite", db_file=database_url[len("sqlite:///"):])
+else:
+    link_manager = LinkManager()
+
+# User accounts store their links (scanned and streamed) in the same LinkManager
+account_manager.set_link_manager(link_manager)
 
 # Initialize bot status
 bot_status = "Not Running"
@@ -55,7 +63,7 @@ def periodic_check():
             try:
                 from bot import check_channels_for_links, setup_bot
                 
-                # Create a bot instance
+                # Get the shared bot instance (getMe is cached between runs)
                 bot = setup_bot(link_manager)
                 if not bot:
                     logger.error("Scheduler: Failed to initialize bot")
@@ -201,7 +209,7 @@ def index():
         websites_links = last_check_result.get('websites_links', 0)
     
     stats = {
-        'total_links': len(link_manager.get_all_links()),
+        'total_links': link_manager.count_links(),
         'total_channels': len(link_manager.get_channels()),
         'total_websites': len(link_manager.get_websites()),
         'last_check': link_manager.get_last_check_time(),
@@ -308,10 +316,10 @@ def links():
     categories = link_manager.get_categories()
     
     # Create a mapping of links to their categories for display
-    link_categories = {}
-    for cat, cat_links in link_manager.get_links_by_category().items():
-        for link in cat_links:
-            link_categories[link] = cat
+    if category:
+        link_categories = {link: category for link in all_links}
+    else:
+        link_categories = link_manager.get_link_categories()
     
     return render_template('links.html', 
                           links=all_links, 
@@ -859,9 +867,26 @@ def remove_token():
         flash("توکن مشخص نشده است", "danger")
         return redirect(url_for('settings'))
     
+    # The main bot's token is the one receiving private messages
+    was_polling_token = token == os.environ.get("TELEGRAM_BOT_TOKEN")
+    
     # Remove the token from rotation
     if link_manager.remove_telegram_token(token):
+        # Stop and drop the bot instance kept for this token
+        from bot import bot_registry, setup_bot
+        bot_registry.discard(token)
         flash("توکن با موفقیت حذف شد", "success")
+        
+        # Refresh the token pool, and hand polling over to the next main token
+        # (remove_telegram_token makes the first remaining token the main one)
+        if link_manager.get_all_telegram_tokens() and os.environ.get("TELEGRAM_BOT_TOKEN") != token:
+            try:
+                bot_instance = setup_bot(link_manager)
+                if was_polling_token and bot_instance:
+                    bot_instance.start_polling()
+                    logger.info("Polling restarted with the next registered token")
+            except Exception as e:
+                logger.error(f"Failed to restart the bot with the next token: {str(e)}")
     else:
         flash("این توکن در سیستم موجود نیست", "warning")
     
@@ -916,27 +941,28 @@ def check_websites_for_links(link_manager):
         # Get the scroll count
         scroll_count = link_manager.get_scroll_count()
         
-        # Extract links from all websites
-        results = extract_links_from_websites(websites, scroll_count)
+        # Extract links from all websites; fetched pages are committed to the HTTP cache
+        # only after their links are stored, so a failure here means they are parsed again
+        cache_sweep = http_cache.sweep("websites")
+        results = extract_links_from_websites(websites, scroll_count, cache_sweep)
         
         # Track total new links found
         total_new_links = 0
         
-        # Process each website's links
-        for website_url, links in results.items():
-            logger.info(f"Found {len(links)} links on {website_url}")
-            
-            # Get the website content for category detection
-            website_content = None  # We don't have the content here, just the links
-            
-            # Add each link
-            new_links_count = 0
-            for link in links:
-                if link_manager.add_website_link(link, website_url, website_content):
-                    new_links_count += 1
-                    
-            logger.info(f"Added {new_links_count} new links from {website_url}")
-            total_new_links += new_links_count
+        # Process each website's links, persisting them all with a single storage write
+        with link_manager.batch():
+            for website_url, links in results.items():
+                logger.info(f"Found {len(links)} links on {website_url}")
+                
+                # Add the links (we don't have the page content here, just the links)
+                link_results = link_manager.add_links_bulk(links, website_url=website_url)
+                new_links_count = sum(1 for _, is_new in link_results if is_new)
+                        
+                logger.info(f"Added {new_links_count} new links from {website_url}")
+                total_new_links += new_links_count
+        
+        # The links are stored; the pages can now count as seen
+        cache_sweep.commit()
             
         # Update the last check time
         link_manager.update_last_check_time()
@@ -979,7 +1005,7 @@ def check_now():
                         logger.error("Telegram bot token not set")
                         return
                     
-                    # Create a bot instance
+                    # Get the shared bot instance (getMe is cached between runs)
                     bot = setup_bot(link_manager)
                     if not bot:
                         logger.error("Failed to initialize bot")
@@ -1184,10 +1210,14 @@ if __name__ == "__main__":
                     all_accounts = account_manager.get_all_accounts()
                     logger.critical(f"[DIRECT_API_DEBUG] Found {len(all_accounts)} total accounts")
                     
+                    # Connect the accounts side by side, so startup waits for the slowest one only
+                    connect_results = safe_run_coroutine(
+                        account_manager.connect_all(),
+                        {},
+                        timeout=account_manager.connect_all_timeout(len(all_accounts))
+                    )
                     for account in all_accounts:
-                        logger.critical(f"[DIRECT_API_DEBUG] Auto-connecting account {account.phone}")
-                        connect_result = safe_run_coroutine(account.connect(), (False, "Error connecting"))
-                        logger.critical(f"[DIRECT_API_DEBUG] Connect result for {account.phone}: {connect_result}, connected={account.connected}, status={account.status}")
+                        logger.critical(f"[DIRECT_API_DEBUG] Connect result for {account.phone}: {connect_results.get(account.phone)}, connected={account.connected}, status={account.status}")
                         
                     # ذخیره وضعیت اکانت‌ها
                     account_manager.save_accounts()
@@ -0,0 +1,55 @@
+import threading
+import time
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+
+class HostRateLimiter:
+    """
+    Thread-safe rate limiter that spaces out requests to each host
+
+    Every host gets a minimum interval between the start of two requests. Callers
+    reserve the next free slot under a lock and then sleep outside of it, so
+    requests to different hosts never wait for each other.
+    """
+
+    def __init__(self, default_rate=5.0, host_rates=None):
+        """
+        Initialize the rate limiter
+
+        Args:
+            default_rate (float): Requests per second allowed for hosts without their own rate
+            host_rates (dict, optional): Host name to requests per second
+        """
+        self.default_rate = default_rate
+        self.host_rates = dict(host_rates or {})
+        self._next_slot = {}  # Host name to the earliest start time of its next request
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """
+        Block until a request to the host may start
+
+        Args:
+            host (str): The host about to be requested
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        rate = self.host_rates.get(host, self.default_rate)
+        if not rate or rate <= 0:
+            return 0.0
+
+        interval = 1.0 / rate
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+
+        delay = slot - now
+        if delay > 0:
+            logger.debug(f"Rate limiting {host}: waiting {delay:.2f}s")
+            time.sleep(delay)
+        return delay
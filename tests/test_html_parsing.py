@@ -0,0 +1,42 @@
+import pytest
+
+from html_parsing import available_backends, get_parser
+
+DECLARED_ENCODING_PAGE = (
+    '<?xml version="1.0" encoding="iso-8859-1"?>'
+    '<html><body><a href="https://t.me/declared">café t.me/other</a></body></html>'
+)
+
+CHANNEL_PAGE = (
+    '<html><body>'
+    '<div class="tgme_widget_message js-widget_message" data-post="channel/41">'
+    '<div class="tgme_widget_message_text">first https://t.me/one</div></div>'
+    '<div class="tgme_widget_message" data-post="channel/42">'
+    '<div class="tgme_widget_message_text">second</div></div>'
+    '</body></html>'
+)
+
+
+@pytest.fixture(params=available_backends())
+def parser(request):
+    return get_parser(request.param)
+
+
+@pytest.mark.parametrize("html", ["", "   ", "\n"])
+def test_empty_document(parser, html):
+    assert parser.channel_posts(html) == []
+    assert parser.link_hrefs(html) == []
+    assert parser.text_content(html).strip() == ""
+
+
+def test_declared_encoding(parser):
+    # The body is already decoded text; the declaration must not be applied again
+    assert parser.link_hrefs(DECLARED_ENCODING_PAGE) == ["https://t.me/declared"]
+    assert "café t.me/other" in parser.text_content(DECLARED_ENCODING_PAGE)
+
+
+def test_channel_posts(parser):
+    assert parser.channel_posts(CHANNEL_PAGE) == [
+        (41, "first https://t.me/one"),
+        (42, "second"),
+    ]
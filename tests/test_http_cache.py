@@ -0,0 +1,99 @@
+import pytest
+
+from http_cache import HttpCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Serves queued responses and records the request headers"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+PAGE = "<html>https://t.me/aaaaa</html>"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(str(tmp_path / "http"))
+
+
+def test_not_modified_after_commit(cache):
+    session = FakeSession(
+        FakeResponse(200, PAGE, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        FakeResponse(304),
+    )
+    first = cache.fetch("https://example.com", session=session)
+    assert (first.cache_status, first.changed) == ("changed", True)
+    first.commit()
+
+    second = cache.fetch("https://example.com", session=session)
+    assert session.requests[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert (second.status_code, second.cache_status, second.changed) == (304, "not_modified", False)
+    assert second.text == PAGE
+    assert not second.pending
+
+
+def test_same_body_is_unchanged(cache):
+    # Servers without validators answer 200 every time; the body hash catches repeats
+    session = FakeSession(FakeResponse(200, PAGE), FakeResponse(200, PAGE), FakeResponse(200, PAGE + " "))
+    cache.fetch("https://example.com", session=session).commit()
+
+    repeat = cache.fetch("https://example.com", session=session)
+    assert session.requests[1] == {}
+    assert (repeat.cache_status, repeat.changed) == ("unchanged", False)
+    repeat.commit()
+
+    edited = cache.fetch("https://example.com", session=session)
+    assert (edited.cache_status, edited.changed) == ("changed", True)
+
+
+def test_uncommitted_page_is_fetched_as_changed(cache):
+    session = FakeSession(FakeResponse(200, PAGE, {"ETag": '"v1"'}), FakeResponse(200, PAGE, {"ETag": '"v1"'}))
+    cache.fetch("https://example.com", session=session)
+
+    again = cache.fetch("https://example.com", session=session)
+    assert session.requests[1] == {}
+    assert again.cache_status == "changed"
+
+
+def test_error_status_is_not_cached(cache):
+    session = FakeSession(FakeResponse(500, "oops"), FakeResponse(200, PAGE))
+    failed = cache.fetch("https://example.com", session=session)
+    assert (failed.cache_status, failed.pending) == ("uncached", False)
+    assert cache.fetch("https://example.com", session=session).cache_status == "changed"
+
+
+def test_sweep_commits_pending_pages(cache):
+    session = FakeSession(
+        FakeResponse(200, PAGE, {"ETag": '"a"'}),
+        FakeResponse(200, PAGE, {"ETag": '"b"'}),
+        FakeResponse(304),
+        FakeResponse(200, PAGE, {"ETag": '"b"'}),
+    )
+    sweep = cache.sweep("test")
+    sweep.fetch("https://example.com/a", session=session)
+    sweep.fetch("https://example.com/b", session=session)
+    sweep.discard("https://example.com/b")
+    assert sweep.commit() == 1
+
+    next_sweep = cache.sweep("test")
+    assert next_sweep.fetch("https://example.com/a", session=session).cache_status == "not_modified"
+    assert next_sweep.fetch("https://example.com/b", session=session).cache_status == "changed"
+    stats = next_sweep.stats()
+    assert (stats['requests'], stats['not_modified'], stats['changed'], stats['hit_rate']) == (2, 1, 1, 0.5)
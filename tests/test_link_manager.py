@@ -0,0 +1,59 @@
+import pytest
+
+from link_manager import LinkManager
+from link_store import JsonLinkStore, SQLiteLinkStore
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def manager(request, tmp_path):
+    return LinkManager(str(tmp_path / "links.json"), storage_backend=request.param, save_delay_ms=0)
+
+
+def stored_links(manager):
+    """Links a fresh store finds on disk, i.e. what survives a crash right now"""
+    if isinstance(manager.store, SQLiteLinkStore):
+        store = SQLiteLinkStore(manager.store.db_file)
+    else:
+        store = JsonLinkStore(manager.store.data_file)
+        store.load()
+    return sorted(store.get_all_links())
+
+
+def test_nested_batch_written_when_outermost_exits(manager):
+    with manager.batch():
+        manager.add_link("https://t.me/aaaaa", channel="news")
+        with manager.batch():
+            manager.add_link("https://t.me/bbbbb", channel="news")
+        assert stored_links(manager) == []
+        # Duplicates are still detected before the links are written
+        assert manager.add_link("https://t.me/aaaaa") is False
+    assert stored_links(manager) == ["https://t.me/aaaaa", "https://t.me/bbbbb"]
+
+
+def test_batch_exception_keeps_added_links(manager):
+    # A batch has no rollback: links added before the error are already in
+    # memory, so they are written out when the batch unwinds
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.add_link("https://t.me/aaaaa")
+            with manager.batch():
+                manager.add_link("https://t.me/bbbbb")
+                raise RuntimeError("sweep failed")
+    assert stored_links(manager) == ["https://t.me/aaaaa", "https://t.me/bbbbb"]
+
+    # The batch is closed, so the next link is written straight away
+    manager.add_link("https://t.me/ccccc")
+    assert stored_links(manager) == ["https://t.me/aaaaa", "https://t.me/bbbbb", "https://t.me/ccccc"]
+
+
+def test_add_links_bulk(manager):
+    results = manager.add_links_bulk(
+        ["https://t.me/aaaaa", ("https://t.me/bbbbb", "new movie"), "https://t.me/aaaaa"],
+        channel="news"
+    )
+    assert results == [
+        ("https://t.me/aaaaa", True),
+        ("https://t.me/bbbbb", True),
+        ("https://t.me/aaaaa", False),
+    ]
+    assert stored_links(manager) == ["https://t.me/aaaaa", "https://t.me/bbbbb"]
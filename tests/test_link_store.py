@@ -0,0 +1,122 @@
+import json
+
+from link_store import JsonLinkStore, SQLiteLinkStore, migrate_json_to_sqlite
+
+
+def read_journal(store):
+    with open(store.journal_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_journal_replayed_on_load(tmp_path):
+    store = JsonLinkStore(str(tmp_path / "links.json"))
+    store.add_link("https://t.me/one", "خبری", channel="news")
+    store.add_link("https://t.me/two", "عمومی")
+    store.increment_website_count("https://example.com")
+
+    reloaded = JsonLinkStore(store.data_file)
+    reloaded.load()
+    assert reloaded.get_all_links() == ["https://t.me/one", "https://t.me/two"]
+    assert reloaded.get_links_by_category("خبری") == ["https://t.me/one"]
+    assert reloaded.channel_link_counts == {"news": 1}
+    assert reloaded.website_link_counts == {"https://example.com": 1}
+    assert reloaded.journal_seq == 3
+
+
+def test_save_truncates_journal(tmp_path):
+    store = JsonLinkStore(str(tmp_path / "links.json"))
+    store.add_link("https://t.me/one", "عمومی", channel="news")
+    store.save({'channels': ["news"]})
+    assert read_journal(store) == []
+    assert store.pending_entries == 0
+
+    # Entries after the snapshot continue the sequence and are replayed on top of it
+    store.add_link("https://t.me/two", "عمومی", channel="news")
+    assert [entry['seq'] for entry in read_journal(store)] == [2]
+
+    reloaded = JsonLinkStore(store.data_file)
+    data = reloaded.load()
+    assert data['channels'] == ["news"]
+    assert reloaded.get_all_links() == ["https://t.me/one", "https://t.me/two"]
+    assert reloaded.channel_link_counts == {"news": 2}
+    assert reloaded.pending_entries == 1
+
+
+def test_replay_skips_entries_in_snapshot(tmp_path):
+    # A crash between writing the snapshot and truncating the journal leaves
+    # entries behind that the snapshot already contains
+    store = JsonLinkStore(str(tmp_path / "links.json"))
+    store.add_link("https://t.me/one", "عمومی", channel="news")
+    store.increment_website_count("https://example.com")
+    with open(store.journal_file, 'r', encoding='utf-8') as f:
+        journal = f.read()
+    store.save({})
+    with open(store.journal_file, 'w', encoding='utf-8') as f:
+        f.write(journal)
+
+    reloaded = JsonLinkStore(store.data_file)
+    reloaded.load()
+    assert reloaded.get_all_links() == ["https://t.me/one"]
+    assert reloaded.channel_link_counts == {"news": 1}
+    assert reloaded.website_link_counts == {"https://example.com": 1}
+    assert reloaded.pending_entries == 0
+
+
+def test_replay_skips_partial_last_line(tmp_path):
+    store = JsonLinkStore(str(tmp_path / "links.json"))
+    store.add_link("https://t.me/one", "عمومی")
+    with open(store.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"op": "link", "link": "https://t.me/tw')
+
+    reloaded = JsonLinkStore(store.data_file)
+    reloaded.load()
+    assert reloaded.get_all_links() == ["https://t.me/one"]
+
+
+def test_batch_holds_back_journal_until_outermost_commit(tmp_path):
+    store = JsonLinkStore(str(tmp_path / "links.json"))
+    store.begin_batch()
+    store.add_link("https://t.me/one", "عمومی")
+    store.begin_batch()
+    store.add_link("https://t.me/two", "عمومی")
+    store.commit_batch()
+    assert not store.exists()
+
+    store.commit_batch()
+    assert [entry['link'] for entry in read_journal(store)] == ["https://t.me/one", "https://t.me/two"]
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    json_file = str(tmp_path / "links.json")
+    db_file = str(tmp_path / "links.db")
+
+    source = JsonLinkStore(json_file)
+    source.add_link("https://t.me/one", "خبری", channel="news")
+    source.save({'channels': ["news"], 'check_interval': 10})
+    source.clear_new_links()
+    source.save({'channels': ["news"], 'check_interval': 10})
+    # Journal entries that are not in the snapshot yet are migrated too
+    source.add_link("https://t.me/two", "عمومی", channel="news")
+    source.increment_website_count("https://example.com")
+
+    assert migrate_json_to_sqlite(json_file, db_file) == 2
+
+    target = SQLiteLinkStore(db_file)
+    data = target.load()
+    assert data['channels'] == ["news"]
+    assert data['check_interval'] == 10
+    assert sorted(target.get_all_links()) == ["https://t.me/one", "https://t.me/two"]
+    assert target.get_new_links() == ["https://t.me/two"]
+    assert target.get_link_categories() == {"https://t.me/one": "خبری", "https://t.me/two": "عمومی"}
+    counts = target._connection().execute(
+        "SELECT source_type, source, count FROM source_counts ORDER BY source_type"
+    ).fetchall()
+    assert counts == [("channel", "news", 2), ("website", "https://example.com", 1)]
+
+    # The database now has data, so a second run leaves it alone
+    assert migrate_json_to_sqlite(json_file, db_file) == 0
+    assert target.count_links() == 2
+
+
+def test_migrate_without_json_data(tmp_path):
+    assert migrate_json_to_sqlite(str(tmp_path / "missing.json"), str(tmp_path / "links.db")) == 0
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+from bot import TelegramBot
+from token_pool import BotTokenPool
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Answers Bot API calls per token and records which token each call used"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def post(self, url, data=None, timeout=None):
+        token = url.split("/bot", 1)[1].split("/", 1)[0]
+        self.calls.append(token)
+        return self.answers[token]
+
+
+OK = FakeResponse(200, {"ok": True, "result": {"id": 1}})
+RATE_LIMITED = FakeResponse(429, {"ok": False, "parameters": {"retry_after": 30}})
+UNAUTHORIZED = FakeResponse(401, {"ok": False, "description": "Unauthorized"})
+FORBIDDEN = FakeResponse(403, {"ok": False, "description": "Forbidden: bot was kicked"})
+
+
+def make_bot(pool, answers):
+    bot = TelegramBot(pool.primary, token_pool=pool)
+    bot.session = FakeSession(answers)
+    return bot
+
+
+def test_acquire_prefers_least_loaded_token():
+    pool = BotTokenPool(["token-a", "token-b"])
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first, second} == {"token-a", "token-b"}
+    pool.release(first)
+    assert pool.acquire() == first
+
+
+def test_rate_limited_token_sits_out():
+    pool = BotTokenPool(["token-a", "token-b"])
+    pool.release(pool.acquire(), retry_after=30)
+    assert [pool.acquire() for _ in range(3)] == ["token-b"] * 3
+
+    stats = {entry['token']: entry for entry in pool.get_stats()}
+    assert stats["...oken-a"]['rate_limited'] == 1
+    assert stats["...oken-a"]['blocked_for'] > 29
+
+
+def test_acquire_waits_when_all_tokens_are_rate_limited():
+    pool = BotTokenPool(["token-a"])
+    pool.penalize("token-a", 0.2)
+    started = time.monotonic()
+    assert pool.acquire() == "token-a"
+    assert time.monotonic() - started >= 0.15
+
+
+def test_disabled_token_is_never_leased():
+    pool = BotTokenPool(["token-a", "token-b"])
+    pool.disable("token-a", "Unauthorized")
+    assert [pool.acquire() for _ in range(3)] == ["token-b"] * 3
+
+    pool.disable("token-b", "Unauthorized")
+    with pytest.raises(ValueError):
+        pool.acquire()
+
+    # Removing a token and adding it again clears its state
+    pool.set_tokens(["token-b"])
+    pool.set_tokens(["token-b", "token-a"])
+    assert pool.acquire() == "token-a"
+
+
+def test_pooled_call_moves_off_rate_limited_token():
+    pool = BotTokenPool(["token-a", "token-b"])
+    bot = make_bot(pool, {"token-a": RATE_LIMITED, "token-b": OK})
+
+    assert bot.make_request("getChat", {"chat_id": "@news"})["ok"]
+    assert bot.make_request("getChat", {"chat_id": "@news"})["ok"]
+    # After its 429 token-a is not tried again during the penalty
+    assert bot.session.calls.count("token-a") == 1
+    assert all(entry['in_flight'] == 0 for entry in pool.get_stats())
+
+
+def test_pooled_call_disables_unauthorized_token():
+    pool = BotTokenPool(["token-a", "token-b"])
+    bot = make_bot(pool, {"token-a": UNAUTHORIZED, "token-b": OK})
+
+    for _ in range(3):
+        assert bot.make_request("getChat", {"chat_id": "@news"})["ok"]
+    assert bot.session.calls.count("token-a") == 1
+    stats = {entry['token']: entry for entry in pool.get_stats()}
+    assert stats["...oken-a"]['disabled'] == "Unauthorized"
+    assert stats["...oken-b"]['disabled'] is None
+
+
+def test_forbidden_fails_without_penalty_or_retry():
+    pool = BotTokenPool(["token-a", "token-b"])
+    bot = make_bot(pool, {"token-a": FORBIDDEN, "token-b": FORBIDDEN})
+
+    result = bot.make_request("getChat", {"chat_id": "@news"})
+    assert result["error_code"] == 403
+    assert len(bot.session.calls) == 1
+    for entry in pool.get_stats():
+        assert entry['disabled'] is None
+        assert entry['rate_limited'] == 0
+        assert entry['blocked_for'] == 0.0
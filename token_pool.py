@@ -0,0 +1,155 @@
+import threading
+import time
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+
+class BotTokenPool:
+    """
+    Thread-safe pool of Telegram bot tokens for spreading Bot API calls
+
+    Each call leases a token: the healthy token with the fewest calls in flight
+    (ties go to the one used least overall). A token that gets a 429 answer sits
+    out for the retry_after Telegram asked for, and calls go to the other tokens
+    meanwhile; only when every token is penalized does a lease wait. A token
+    Telegram rejects (revoked or invalid) is disabled and never leased again.
+    """
+
+    def __init__(self, tokens=None):
+        """
+        Initialize the pool
+
+        Args:
+            tokens (list, optional): Bot tokens; the first one is the primary token
+        """
+        self._tokens = []
+        self._state = {}  # Token to its counters and penalty
+        self._lock = threading.Lock()
+        self.set_tokens(tokens or [])
+
+    def set_tokens(self, tokens):
+        """
+        Replace the pooled tokens, keeping the counters and penalties of tokens that stay
+
+        Args:
+            tokens (list): Bot tokens; the first one is the primary token
+        """
+        with self._lock:
+            self._tokens = list(dict.fromkeys(token for token in tokens if token))
+            self._state = {
+                token: self._state.get(token) or {
+                    'in_flight': 0, 'requests': 0, 'rate_limited': 0, 'blocked_until': 0.0,
+                    'disabled': None
+                }
+                for token in self._tokens
+            }
+
+    @property
+    def primary(self):
+        """The primary token, used for calls that must come from the main bot"""
+        with self._lock:
+            return self._tokens[0] if self._tokens else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tokens)
+
+    def acquire(self):
+        """
+        Lease the least loaded healthy token, waiting if all of them are rate limited
+
+        Returns:
+            str: The token; give it back with release()
+        """
+        while True:
+            with self._lock:
+                usable = [token for token in self._tokens if not self._state[token]['disabled']]
+                if not usable:
+                    raise ValueError("No usable bot tokens in the pool")
+
+                now = time.monotonic()
+                healthy = [token for token in usable if self._state[token]['blocked_until'] <= now]
+                if healthy:
+                    token = min(healthy, key=lambda t: (self._state[t]['in_flight'], self._state[t]['requests']))
+                    state = self._state[token]
+                    state['in_flight'] += 1
+                    state['requests'] += 1
+                    return token
+
+                delay = min(self._state[token]['blocked_until'] for token in usable) - now
+
+            logger.debug(f"All {len(self)} bot tokens are rate limited, waiting {delay:.1f}s")
+            time.sleep(max(delay, 0.05))
+
+    def release(self, token, retry_after=None):
+        """
+        Give back a leased token
+
+        Args:
+            token (str): The token returned by acquire()
+            retry_after (float, optional): Seconds Telegram asked to wait (429 answer)
+        """
+        with self._lock:
+            state = self._state.get(token)
+            if state is not None:  # Otherwise removed from the pool while leased
+                state['in_flight'] = max(state['in_flight'] - 1, 0)
+        if retry_after:
+            self.penalize(token, retry_after)
+
+    def penalize(self, token, retry_after):
+        """
+        Keep a token out of rotation after a 429 answer
+
+        Args:
+            token (str): The rate limited token
+            retry_after (float): Seconds Telegram asked to wait
+        """
+        with self._lock:
+            state = self._state.get(token)
+            if state is None:
+                return
+            state['rate_limited'] += 1
+            state['blocked_until'] = max(state['blocked_until'], time.monotonic() + retry_after)
+        logger.warning(f"Bot token ...{token[-6:]} rate limited for {retry_after}s")
+
+    def disable(self, token, reason):
+        """
+        Take a token out of rotation for good (e.g. revoked: HTTP 401)
+
+        The token stays disabled until it is removed from the pool and added again.
+
+        Args:
+            token (str): The rejected token
+            reason (str): Telegram's error description, shown in the stats
+        """
+        with self._lock:
+            state = self._state.get(token)
+            if state is None or state['disabled']:
+                return
+            state['disabled'] = reason
+        logger.error(f"Bot token ...{token[-6:]} disabled: {reason}")
+
+    def get_stats(self):
+        """
+        Get per-token usage
+
+        Returns:
+            list: One dict per token (masked), with requests, rate limits, calls in
+                flight, seconds of penalty left and why it is disabled (None if it is not)
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [{
+                'token': f"...{token[-6:]}",
+                'requests': self._state[token]['requests'],
+                'rate_limited': self._state[token]['rate_limited'],
+                'in_flight': self._state[token]['in_flight'],
+                'blocked_for': max(self._state[token]['blocked_until'] - now, 0.0),
+                'disabled': self._state[token]['disabled']
+            } for token in self._tokens]
+
+
+# Shared pool, so rate-limit penalties outlive individual bot instances
+token_pool = BotTokenPool()
@@ -4,19 +4,34 @@ import time
 import logging
 import hashlib
 import asyncio
+import functools
 from telethon import TelegramClient, events
 from telethon.errors import SessionPasswordNeededError, FloodWaitError
-from telethon.tl.functions.messages import GetDialogsRequest
-from telethon.tl.types import InputPeerEmpty, Channel, Chat, User
+from telethon.tl.types import User
 from telethon.network import ConnectionTcpIntermediate
+from telethon.utils import resolve_id
 from datetime import datetime
 
 # Import Avalai API client
 from avalai_api import avalai_client
+from link_extraction import extract_telegram_links
+from link_ingestion import LinkIngestionQueue
+from dialog_index import DialogIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Concurrency of link scans: groups fetched at once per account, and across all accounts
+ACCOUNT_SCAN_CONCURRENCY = 4
+GLOBAL_SCAN_CONCURRENCY = 12
+
+# How often a group fetch is retried after a FloodWaitError
+MAX_FLOOD_WAIT_RETRIES = 3
+
+# Accounts connected at the same time, and seconds one account may take to connect
+CONNECT_CONCURRENCY = 8
+CONNECT_TIMEOUT = 60
+
 class UserAccount:
     """Represents a user Telegram account with its authentication details"""
     
@@ -33,6 +48,12 @@ class UserAccount:
         self.session_file = f"sessions/{self._get_safe_filename(phone)}"
         self.last_check = None
         self.last_connection_attempt = None
+        self._flood_wait_until = 0.0  # Monotonic time before which this account sends no scan requests
+        self.dialog_last_message_ids = {}  # Dialog id (str) to the newest message id already scanned
+        self._stream_gaps = {}             # Dialog id (str) to the oldest live message whose links were lost
+        self.streaming = False        # Capture group links live from NewMessage events (opt-in)
+        self.link_ingestion = None    # LinkIngestionQueue streamed links go to, set by AccountManager
+        self.dialog_index = None      # DialogIndex of the current client's groups
     
     def _get_safe_filename(self, phone):
         """Convert phone number to a safe filename"""
@@ -271,6 +292,14 @@ class UserAccount:
                 
             logger.critical(f"[CONNECT_DEBUG] Registered event handler for NewMessage events for account {self.phone}")
             
+            # Live link capture from groups and channels, if enabled for this account
+            if self.streaming:
+                self._register_group_handler()
+            
+            # Group list for link scans, kept current from update events
+            self.dialog_index = DialogIndex(self.client)
+            self.dialog_index.attach()
+            
             # Connect and check if already authorized
             try:
                 logger.critical(f"[CONNECT_DEEP_DEBUG] Calling client.connect() for {self.phone}")
@@ -339,6 +368,85 @@ class UserAccount:
             self.error = str(e)
             return False, f"Connection error: {str(e)}"
     
+    def _register_group_handler(self):
+        """Register the NewMessage handler that captures group and channel links"""
+        if not self.client or self.link_ingestion is None:
+            logger.warning(f"Cannot stream links for {self.phone}: no client or ingestion queue")
+            return False
+        self.client.remove_event_handler(self._handle_group_message)
+        self.client.add_event_handler(
+            self._handle_group_message,
+            events.NewMessage(func=lambda e: e.is_group or e.is_channel)
+        )
+        logger.info(f"Streaming group links for account {self.phone}")
+        return True
+    
+    async def _handle_group_message(self, event):
+        """Queue the links of a new group or channel message for storage"""
+        try:
+            text = event.raw_text
+            links = extract_telegram_links(text, include_mentions=False) if text else []
+            dialog_key = str(resolve_id(event.chat_id)[0])
+            message_id = event.id
+            
+            group_name = None
+            if links:
+                chat = await event.get_chat()
+                group_name = getattr(chat, 'title', None) or str(event.chat_id)
+            
+            # The mark only moves once the links are stored (and, since the queue keeps
+            # order, those of earlier messages too); if they are lost, the next scan
+            # fetches the message again. Messages without links go through the queue
+            # for the ordering alone.
+            loop = asyncio.get_running_loop()
+            self.link_ingestion.put(
+                group_name, [(link, text) for link in links],
+                on_stored=lambda: loop.call_soon_threadsafe(self._advance_dialog_mark, dialog_key, message_id),
+                on_lost=lambda: loop.call_soon_threadsafe(self._record_stream_gap, dialog_key, message_id)
+            )
+        except Exception as e:
+            logger.error(f"Error capturing links from live message for {self.phone}: {str(e)}")
+    
+    def _advance_dialog_mark(self, dialog_key, message_id):
+        """
+        Move a dialog's high-water mark past a message handled live, so the next scan
+        does not fetch it again; dialogs never scanned keep their first full scan
+        """
+        # Never past a message whose links were lost; the next scan has to fetch it
+        gap = self._stream_gaps.get(dialog_key)
+        if gap is not None:
+            message_id = min(message_id, gap - 1)
+        if message_id > self.dialog_last_message_ids.get(dialog_key, message_id):
+            self.dialog_last_message_ids[dialog_key] = message_id
+    
+    def _record_stream_gap(self, dialog_key, message_id):
+        """Remember a live message whose links were dropped or could not be stored"""
+        logger.warning(f"Links of live message {message_id} in dialog {dialog_key} were lost; "
+                       f"the next scan of account {self.phone} fetches it again")
+        self._stream_gaps[dialog_key] = min(message_id, self._stream_gaps.get(dialog_key, message_id))
+        mark = self.dialog_last_message_ids.get(dialog_key)
+        if mark is not None and mark >= message_id:
+            self.dialog_last_message_ids[dialog_key] = message_id - 1
+    
+    def set_streaming(self, enabled):
+        """
+        Turn live link capture on or off, taking effect at once if the account is connected
+        
+        Args:
+            enabled (bool): Whether to stream group links
+            
+        Returns:
+            bool: True if the setting is in effect
+        """
+        self.streaming = bool(enabled)
+        if not self.client:
+            return True
+        if self.streaming:
+            return self._register_group_handler()
+        self.client.remove_event_handler(self._handle_group_message)
+        logger.info(f"Stopped streaming group links for account {self.phone}")
+        return True
+    
     async def check_handlers(self):
         """Check if event handlers are properly registered"""
         if not self.client:
@@ -441,8 +549,121 @@ class UserAccount:
             self.error = str(e)
             return False, f"Disconnect error: {str(e)}"
     
-    async def check_groups_for_links(self, link_manager, max_messages=100):
-        """Check all groups this account is a member of for new links"""
+    async def _fetch_group_messages(self, chat, semaphores, **kwargs):
+        """
+        Get messages from a group, honouring this account's flood wait
+        
+        The semaphores are held only while the request is in flight, so an account
+        sitting out a FloodWaitError does not block other accounts' scans.
+        
+        Args:
+            chat: The group entity
+            semaphores: Semaphores to hold during the request
+            **kwargs: Arguments for client.get_messages
+            
+        Returns:
+            list: The messages
+        """
+        for attempt in range(MAX_FLOOD_WAIT_RETRIES):
+            delay = self._flood_wait_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            for semaphore in semaphores:
+                await semaphore.acquire()
+            try:
+                return await self.client.get_messages(chat, **kwargs)
+            except FloodWaitError as e:
+                # Every scan task of this account waits, not just this one
+                self._flood_wait_until = max(self._flood_wait_until, time.monotonic() + e.seconds)
+                logger.warning(f"Flood wait of {e.seconds}s for account {self.phone} "
+                               f"(attempt {attempt+1}/{MAX_FLOOD_WAIT_RETRIES})")
+                if attempt == MAX_FLOOD_WAIT_RETRIES - 1:
+                    raise
+            finally:
+                for semaphore in reversed(semaphores):
+                    semaphore.release()
+    
+    async def _check_group_for_links(self, chat, link_manager, max_messages, semaphores):
+        """
+        Check one group for new links
+        
+        Returns:
+            int: Number of new links, or None if the group could not be checked
+        """
+        group_name = getattr(chat, 'title', 'Unknown Group')
+        logger.info(f"Checking group: {group_name} for account {self.phone}")
+        new_links_in_group = 0
+        
+        try:
+            # Get messages from the group; after the first scan only newer ones are fetched
+            dialog_key = str(chat.id)
+            last_message_id = self.dialog_last_message_ids.get(dialog_key)
+            if last_message_id:
+                logger.info(f"Fetching up to {max_messages} messages newer than {last_message_id} from group {group_name}")
+                messages = await self._fetch_group_messages(chat, semaphores, limit=max_messages,
+                                                            min_id=last_message_id)
+            else:
+                logger.info(f"Fetching {max_messages} messages from group {group_name}")
+                messages = await self._fetch_group_messages(chat, semaphores, limit=max_messages)
+            logger.info(f"Retrieved {len(messages)} messages from group {group_name}")
+            
+            # Look for telegram links in messages
+            link_items = []
+            for message in messages:
+                if message.message:
+                    # Extract links with the shared extractor
+                    found_links = extract_telegram_links(message.message, include_mentions=False)
+                    
+                    if found_links:
+                        logger.debug(f"Found {len(found_links)} links in message from {group_name}")
+                    
+                    link_items.extend((link, message.message) for link in found_links)
+            
+            # Add the group's links with a single storage write and track which are new. The
+            # write takes the LinkManager lock and touches disk, so it runs off the event loop
+            # to keep the other clients' fetches and update handlers going meanwhile
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(
+                None, functools.partial(link_manager.add_links_bulk, link_items, channel=group_name)
+            )
+            for link, is_new in stored:
+                if is_new:
+                    logger.info(f"New link found in {group_name}: {link}")
+                    new_links_in_group += 1
+            
+            # Advance the high-water mark only once the links are stored
+            if messages:
+                newest_id = max(message.id for message in messages)
+                if newest_id > (last_message_id or 0):
+                    self.dialog_last_message_ids[dialog_key] = newest_id
+                # Live messages lost up to here have now been scanned
+                if self._stream_gaps.get(dialog_key, newest_id + 1) <= newest_id:
+                    del self._stream_gaps[dialog_key]
+            
+            if new_links_in_group > 0:
+                logger.info(f"Group {group_name} provided {new_links_in_group} new links")
+            else:
+                logger.info(f"No new links found in group {group_name}")
+            return new_links_in_group
+        
+        except Exception as e:
+            logger.error(f"Error checking group {group_name}: {str(e)}")
+            return None
+    
+    async def check_groups_for_links(self, link_manager, max_messages=100,
+                                     concurrency=ACCOUNT_SCAN_CONCURRENCY, global_semaphore=None):
+        """Check all groups this account is a member of for new links
+        
+        Groups are fetched concurrently, at most `concurrency` at a time for this
+        account and, if global_semaphore is given, within the limit shared by all accounts.
+        
+        Args:
+            link_manager: The LinkManager to add links to
+            max_messages (int): Messages fetched per group
+            concurrency (int): Groups fetched at the same time for this account
+            global_semaphore (asyncio.Semaphore, optional): Limit shared with other accounts
+        """
         if not self.client or not self.connected:
             logger.warning(f"Account {self.phone} is not connected for checking links")
             return {
@@ -458,70 +679,37 @@ class UserAccount:
             self.last_check = datetime.now()
             logger.info(f"Starting group check for account {self.phone}")
             
-            # Get all dialogs
-            logger.info(f"Fetching dialogs for account {self.phone}")
-            result = await self.client(GetDialogsRequest(
-                offset_date=None,
-                offset_id=0,
-                offset_peer=InputPeerEmpty(),
-                limit=500,
-                hash=0
-            ))
-            
-            # Filter for groups and channels
-            chats = []
-            for dialog in result.dialogs:
-                entity = dialog.entity
-                if isinstance(entity, (Chat, Channel)) and not entity.broadcast:
-                    chats.append(entity)
+            # Get the groups from the dialog index (all dialogs are paged through only
+            # when the index is empty or older than its TTL)
+            if self.dialog_index is None or self.dialog_index.client is not self.client:
+                self.dialog_index = DialogIndex(self.client)
+                self.dialog_index.attach()
+            chats = await self.dialog_index.get_groups()
             
             logger.info(f"Found {len(chats)} groups/chats to check for account {self.phone}")
             
-            # Initialize result statistics
+            # Check the groups concurrently
+            semaphores = [asyncio.Semaphore(concurrency)]
+            if global_semaphore is not None:
+                semaphores.append(global_semaphore)
+            group_results = await asyncio.gather(*[
+                self._check_group_for_links(chat, link_manager, max_messages, semaphores)
+                for chat in chats
+            ])
+            
+            # Collect results in dialog order, as the sequential scan did
             groups_checked = 0
             total_new_links = 0
             groups_with_links = {}
-            
-            # Check each group
-            for chat in chats:
-                group_name = getattr(chat, 'title', 'Unknown Group')
-                logger.info(f"Checking group: {group_name} for account {self.phone}")
-                new_links_in_group = 0
-                
-                try:
-                    # Get messages from the group
-                    logger.info(f"Fetching {max_messages} messages from group {group_name}")
-                    messages = await self.client.get_messages(chat, limit=max_messages)
-                    logger.info(f"Retrieved {len(messages)} messages from group {group_name}")
-                    
-                    # Look for telegram links in messages
-                    for message in messages:
-                        if message.message:
-                            # Extract links using the link manager
-                            found_links = link_manager.extract_links(message.message)
-                            
-                            if found_links:
-                                logger.debug(f"Found {len(found_links)} links in message from {group_name}")
-                            
-                            for link in found_links:
-                                # Add the link and track if it's new
-                                if link_manager.add_link(link, group_name, message.message):
-                                    logger.info(f"New link found in {group_name}: {link}")
-                                    new_links_in_group += 1
-                    
-                    groups_checked += 1
-                    
-                    # Only include groups that provided new links
-                    if new_links_in_group > 0:
-                        logger.info(f"Group {group_name} provided {new_links_in_group} new links")
-                        groups_with_links[group_name] = new_links_in_group
-                        total_new_links += new_links_in_group
-                    else:
-                        logger.info(f"No new links found in group {group_name}")
-                
-                except Exception as e:
-                    logger.error(f"Error checking group {group_name}: {str(e)}")
+            for chat, new_links_in_group in zip(chats, group_results):
+                if new_links_in_group is None:
                     continue
+                groups_checked += 1
+                
+                # Only include groups that provided new links
+                if new_links_in_group > 0:
+                    groups_with_links[getattr(chat, 'title', 'Unknown Group')] = new_links_in_group
+                    total_new_links += new_links_in_group
             
             return {
                 "success": True,
@@ -645,7 +833,9 @@ class UserAccount:
             "status": self.status,
             "connected": self.connected,
             "error": self.error,
-            "last_check": self.last_check.isoformat() if self.last_check else None
+            "last_check": self.last_check.isoformat() if self.last_check else None,
+            "dialog_last_message_ids": dict(self.dialog_last_message_ids),
+            "streaming": self.streaming
         }
     
     @classmethod
@@ -660,6 +850,8 @@ class UserAccount:
         account.status = data.get("status", "inactive")
         account.connected = data.get("connected", False)
         account.error = data.get("error")
+        account.dialog_last_message_ids = data.get("dialog_last_message_ids", {})
+        account.streaming = data.get("streaming", False)
         
         if data.get("last_check"):
             try:
@@ -677,8 +869,45 @@ class AccountManager:
         """Initialize a new account manager"""
         self.accounts_file = accounts_file
         self.accounts = {}
+        self.link_manager = None     # LinkManager the accounts store links in, set by the app
+        self.link_ingestion = None   # Queue for links streamed from NewMessage events
         self.load_accounts()
     
+    def set_link_manager(self, link_manager):
+        """
+        Set the LinkManager used for account link checks and live link capture
+        
+        Args:
+            link_manager: The application's LinkManager instance
+        """
+        self.link_manager = link_manager
+        self.link_ingestion = LinkIngestionQueue(link_manager)
+        for account in self.accounts.values():
+            account.link_ingestion = self.link_ingestion
+            if account.streaming and account.client:
+                account.set_streaming(True)
+    
+    def set_account_streaming(self, phone, enabled):
+        """
+        Turn live link capture on or off for an account
+        
+        Args:
+            phone (str): The account's phone number
+            enabled (bool): Whether to stream group links
+            
+        Returns:
+            tuple: (success, message)
+        """
+        account = self.accounts.get(phone)
+        if not account:
+            return False, "Account not found"
+        if enabled and self.link_ingestion is None:
+            return False, "Link manager not configured"
+        
+        account.set_streaming(enabled)
+        self.save_accounts()
+        return True, "Streaming enabled" if enabled else "Streaming disabled"
+    
     def load_accounts(self):
         """Load accounts from JSON file"""
         try:
@@ -688,6 +917,7 @@ class AccountManager:
                     
                     for phone, account_data in accounts_data.items():
                         self.accounts[phone] = UserAccount.from_dict(account_data)
+                        self.accounts[phone].link_ingestion = self.link_ingestion
                         
                 logger.info(f"Loaded {len(self.accounts)} accounts from storage")
         except Exception as e:
@@ -716,6 +946,7 @@ class AccountManager:
             
             # Create and add the account
             account = UserAccount(phone, api_id, api_hash, name)
+            account.link_ingestion = self.link_ingestion
             self.accounts[phone] = account
             
             # Save accounts
@@ -794,7 +1025,8 @@ class AccountManager:
                 results["already_connected"] += 1
                 results["account_status"][phone] = "already_connected"
             
-        # Now, try to connect accounts that need connection
+        # Now, collect the accounts that need connection
+        to_connect = []
         for phone, account in self.accounts.items():
             # Only try to reconnect accounts that were previously active but are not connected now
             if account.status == "active" and not account.connected:
@@ -802,25 +1034,27 @@ class AccountManager:
                 
                 results["connection_attempts"] += 1
                 
-                try:
-                    # Use the safe_run_coroutine helper to run the async connect method
-                    from async_helper import safe_run_coroutine
-                    connect_result = safe_run_coroutine(account.connect())
-                    
-                    logger.info(f"Connect result for {phone}: {connect_result}")
-                    
-                    # Check if the connection was successful
-                    if account.connected and account.status == "active":
-                        results["connection_success"] += 1
-                        results["account_status"][phone] = "connected"
-                    else:
-                        results["connection_failures"] += 1
-                        results["account_status"][phone] = f"failed: {account.error or 'Unknown error'}"
+                to_connect.append(account)
+        
+        # Connect them side by side on the shared event loop
+        if to_connect:
+            from async_helper import safe_run_coroutine
+            connect_results = safe_run_coroutine(
+                self.connect_accounts(to_connect),
+                {},
+                timeout=self.connect_all_timeout(len(to_connect))
+            )
+            
+            for account in to_connect:
+                logger.info(f"Connect result for {account.phone}: {connect_results.get(account.phone)}")
                 
-                except Exception as e:
-                    logger.error(f"Exception connecting account {phone}: {str(e)}")
+                # Check if the connection was successful
+                if account.connected and account.status == "active":
+                    results["connection_success"] += 1
+                    results["account_status"][account.phone] = "connected"
+                else:
                     results["connection_failures"] += 1
-                    results["account_status"][phone] = f"exception: {str(e)}"
+                    results["account_status"][account.phone] = f"failed: {account.error or 'Unknown error'}"
         
         # Save updated account data
         self.save_accounts()
@@ -828,35 +1062,87 @@ class AccountManager:
         
         return results
     
-    async def connect_all(self):
-        """Connect all accounts"""
-        results = {}
-        connection_attempts = 0
-        connection_successes = 0
-        
-        logger.critical(f"[CONNECTION_DEBUG] Starting to connect {len(self.accounts)} accounts")
+    @staticmethod
+    def connect_all_timeout(count, concurrency=CONNECT_CONCURRENCY, timeout=CONNECT_TIMEOUT):
+        """
+        Longest time connecting count accounts can take
         
-        for phone, account in self.accounts.items():
-            connection_attempts += 1
-            logger.critical(f"[CONNECTION_DEBUG] Attempting to connect account {phone} (attempt {connection_attempts}/{len(self.accounts)})")
+        Args:
+            count (int): Number of accounts
+            concurrency (int): Accounts connected at the same time
+            timeout (float): Seconds allowed per account
             
+        Returns:
+            float: Seconds, for callers waiting on connect_accounts from another thread
+        """
+        waves = -(-count // max(concurrency, 1))
+        return waves * timeout + 10
+    
+    async def _connect_account(self, account, semaphore, timeout):
+        """
+        Connect one account, giving up after timeout seconds
+        
+        Returns:
+            tuple: (success, message)
+        """
+        async with semaphore:
+            logger.critical(f"[CONNECTION_DEBUG] Attempting to connect account {account.phone}")
             try:
-                success, message = await account.connect()
-                results[phone] = {"success": success, "message": message}
-                
-                if success:
-                    connection_successes += 1
-                    logger.critical(f"[CONNECTION_DEBUG] Successfully connected account {phone}")
-                else:
-                    logger.critical(f"[CONNECTION_DEBUG] Failed to connect account {phone}: {message}")
+                success, message = await asyncio.wait_for(account.connect(), timeout)
+            except asyncio.TimeoutError:
+                # Leave the status alone so the account is tried again next time
+                account.connected = False
+                account.error = f"Connection timed out after {timeout}s"
+                if account.client:
+                    try:
+                        await account.client.disconnect()
+                    except Exception:
+                        pass
+                success, message = False, account.error
             except Exception as e:
-                logger.critical(f"[CONNECTION_DEBUG] Exception while connecting account {phone}: {str(e)}")
+                logger.critical(f"[CONNECTION_DEBUG] Exception while connecting account {account.phone}: {str(e)}")
                 import traceback
                 logger.critical(f"[CONNECTION_DEBUG] Traceback: {traceback.format_exc()}")
-                results[phone] = {"success": False, "message": f"Exception: {str(e)}"}
+                success, message = False, f"Exception: {str(e)}"
+        
+        if success:
+            logger.critical(f"[CONNECTION_DEBUG] Successfully connected account {account.phone}")
+        else:
+            logger.critical(f"[CONNECTION_DEBUG] Failed to connect account {account.phone}: {message}")
+        return success, message
+    
+    async def connect_accounts(self, accounts, concurrency=CONNECT_CONCURRENCY, timeout=CONNECT_TIMEOUT):
+        """
+        Connect several accounts concurrently
         
-        # Log a summary of connection attempts
-        logger.critical(f"[CONNECTION_DEBUG] Connection summary: {connection_successes}/{connection_attempts} accounts connected successfully")
+        Args:
+            accounts (list): The UserAccount objects to connect
+            concurrency (int): Accounts connected at the same time
+            timeout (float): Seconds one account may take before it counts as failed
+            
+        Returns:
+            dict: Phone number to {"success": bool, "message": str}
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        started = time.monotonic()
+        outcomes = await asyncio.gather(
+            *(self._connect_account(account, semaphore, timeout) for account in accounts)
+        )
+        results = {
+            account.phone: {"success": success, "message": message}
+            for account, (success, message) in zip(accounts, outcomes)
+        }
+        
+        connected = sum(1 for result in results.values() if result["success"])
+        logger.critical(f"[CONNECTION_DEBUG] Connected {connected}/{len(accounts)} accounts "
+                        f"in {time.monotonic() - started:.1f}s (concurrency {concurrency})")
+        return results
+    
+    async def connect_all(self, concurrency=CONNECT_CONCURRENCY, timeout=CONNECT_TIMEOUT):
+        """Connect all accounts"""
+        logger.critical(f"[CONNECTION_DEBUG] Starting to connect {len(self.accounts)} accounts")
+        
+        results = await self.connect_accounts(list(self.accounts.values()), concurrency, timeout)
         
         # Save accounts after connection attempts
         self.save_accounts()
@@ -892,19 +1178,8 @@ class AccountManager:
             logger.critical("[CONNECTION_DEBUG] No active accounts found, trying to reconnect accounts")
             
             # Try to reconnect accounts
-            reconnected = 0
-            for phone, account in self.accounts.items():
-                if not account.connected:
-                    logger.critical(f"[CONNECTION_DEBUG] Attempting to reconnect account {phone}")
-                    try:
-                        success, message = await account.connect()
-                        if success:
-                            reconnected += 1
-                            logger.critical(f"[CONNECTION_DEBUG] Successfully reconnected account {phone}")
-                        else:
-                            logger.critical(f"[CONNECTION_DEBUG] Failed to reconnect account {phone}: {message}")
-                    except Exception as e:
-                        logger.critical(f"[CONNECTION_DEBUG] Error reconnecting account {phone}: {str(e)}")
+            to_reconnect = [account for account in self.accounts.values() if not account.connected]
+            reconnect_results = await self.connect_accounts(to_reconnect)
             
             # Save accounts after reconnection attempts
             self.save_accounts()
@@ -921,8 +1196,8 @@ class AccountManager:
                     "accounts_checked": 0,
                     "accounts_with_links": 0,
                     "account_results": {},
-                    "reconnection_attempts": len(self.accounts),
-                    "reconnection_success": reconnected
+                    "reconnection_attempts": len(to_reconnect),
+                    "reconnection_success": sum(1 for result in reconnect_results.values() if result.get("success"))
                 }
         
         account_results = {}
@@ -930,26 +1205,17 @@ class AccountManager:
         accounts_with_links = 0
         total_groups_checked = 0
         
-        # Check each active account
-        for account in active_accounts:
+        # Check the active accounts concurrently; each group's links are stored as soon as it is scanned
+        global_semaphore = asyncio.Semaphore(GLOBAL_SCAN_CONCURRENCY)
+        
+        async def check_account(account):
             logger.info(f"Checking groups for account: {account.phone}")
             try:
-                result = await account.check_groups_for_links(link_manager, max_messages)
-                account_results[account.phone] = result
-                
-                # Track total groups checked across all accounts
-                groups_checked = result.get("groups_checked", 0)
-                total_groups_checked += groups_checked
-                
-                if result["success"] and result["new_links"] > 0:
-                    logger.info(f"Account {account.phone} found {result['new_links']} new links in {len(result['groups_with_links'])} groups")
-                    total_new_links += result["new_links"]
-                    accounts_with_links += 1
-                else:
-                    logger.info(f"Account {account.phone} found no new links in {groups_checked} groups")
+                return await account.check_groups_for_links(link_manager, max_messages,
+                                                            global_semaphore=global_semaphore)
             except Exception as e:
                 logger.error(f"Error checking account {account.phone}: {str(e)}")
-                account_results[account.phone] = {
+                return {
                     "success": False,
                     "error": str(e),
                     "new_links": 0,
@@ -957,6 +1223,22 @@ class AccountManager:
                     "groups_with_links": {}
                 }
         
+        results = await asyncio.gather(*[check_account(account) for account in active_accounts])
+        
+        for account, result in zip(active_accounts, results):
+            account_results[account.phone] = result
+            
+            # Track total groups checked across all accounts
+            groups_checked = result.get("groups_checked", 0)
+            total_groups_checked += groups_checked
+            
+            if result["success"] and result["new_links"] > 0:
+                logger.info(f"Account {account.phone} found {result['new_links']} new links in {len(result['groups_with_links'])} groups")
+                total_new_links += result["new_links"]
+                accounts_with_links += 1
+            else:
+                logger.info(f"Account {account.phone} found no new links in {groups_checked} groups")
+        
         # Save accounts after checking
         self.save_accounts()
         
@@ -2,14 +2,12 @@
 Web crawler module for extracting Telegram links from websites with auto-scrolling capability.
 This module offers two methods:
 1. Selenium for dynamic websites with scrolling (if available)
-2. Requests+BeautifulSoup as a fallback for static content
+2. Requests plus a fast HTML parser as a fallback for static content
 """
 
 import time
-import re
 import logging
 import requests
-from bs4 import BeautifulSoup
 import traceback
 from typing import List, Set, Dict, Optional
 from urllib.parse import urlparse
@@ -27,21 +25,16 @@ try:
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
-    print("Selenium not available, will use requests/BeautifulSoup instead")
+    print("Selenium not available, will use requests instead")
 
 from logger import get_logger
+from link_extraction import extract_telegram_links
+from http_cache import http_cache
+from html_parsing import get_parser
 
 # Setup logger
 logger = get_logger("web_crawler")
 
-# Regular expressions for finding Telegram links
-# 1. Pattern for invite links (t.me/joinchat or t.me/+)
-TELEGRAM_INVITE_PATTERN = r'(?:https?://)?(?:www\.)?(?:t(?:elegram)?\.me|telegram\.org)/(?:joinchat/|\+)([a-zA-Z0-9_-]+)'
-# 2. Pattern for public group/channel links with @ or t.me format
-TELEGRAM_PUBLIC_PATTERN = r'(?:@([a-zA-Z0-9_]{5,})|(?:https?://)?(?:www\.)?(?:t(?:elegram)?\.me|telegram\.org)/([a-zA-Z0-9_]{5,}))'
-# 3. Pattern for @ username format specifically
-AT_USERNAME_PATTERN = r'@([a-zA-Z][a-zA-Z0-9_]{3,})'
-
 
 class WebCrawler:
     """Web crawler for extracting Telegram links from websites with auto-scrolling capability."""
@@ -194,34 +187,9 @@ class WebCrawler:
         Returns:
             Set[str]: Set of found Telegram links
         """
-        # Find all matches in the content
-        links = []
-        
-        # Find t.me/joinchat and t.me/+ links (private groups/channels)
-        invite_matches = re.findall(r'https?://(?:www\.)?t(?:elegram)?\.me/(?:joinchat/|\+)([a-zA-Z0-9_-]+)', content)
-        for match in invite_matches:
-            links.append(f"https://t.me/joinchat/{match}")
-        
-        # Find t.me/username links (public channels/groups)
-        username_matches = re.findall(r'https?://(?:www\.)?t(?:elegram)?\.me/([a-zA-Z][a-zA-Z0-9_]{3,})', content)
-        for match in username_matches:
-            # Skip common non-channel usernames
-            if match.lower() not in ['joinchat', 'share', 'home', 'login', 'download', 'features', 
-                                     'contact', 'privacy', 'faq', 'blog', 'terms', 'apps', 'premium']:
-                links.append(f"https://t.me/{match}")
-        
-        # Find @username mentions (public channels/groups)
-        # This is especially important for sites like combot.org that list Telegram groups with @ format
-        at_username_matches = re.findall(r'@([a-zA-Z][a-zA-Z0-9_]{3,})', content)
-        for match in at_username_matches:
-            # Skip if it looks like an email address or common words
-            if '.' not in match and match.lower() not in ['gmail', 'yahoo', 'hotmail', 'outlook', 'mail', 'email']:
-                # For combot.org and similar sites, return the @username format
-                # which will be normalized in link_manager.add_website_link
-                links.append(f"@{match}")
-        
-        # Remove duplicates and return
-        return set(links)
+        # Invite links, t.me/username links and @username mentions (important for sites
+        # like combot.org that list Telegram groups in @ format), already normalized
+        return set(extract_telegram_links(content))
 
     def batch_process_urls(self, urls: List[str], scroll_count: int = 5) -> Dict[str, Set[str]]:
         """
@@ -252,13 +220,16 @@ class WebCrawler:
         return results
 
 
-def extract_links_with_requests(url: str) -> Set[str]:
+def extract_links_with_requests(url: str, cache_sweep=None) -> Set[str]:
     """
-    Extract Telegram links using simple requests and BeautifulSoup instead of Selenium.
+    Extract Telegram links using simple requests and a fast HTML parser instead of Selenium.
     This is a fallback method when Selenium is not available or fails.
     
     Args:
         url (str): URL to extract links from
+        cache_sweep: Optional HttpCacheSweep; a page that has not changed since the
+            last fetch is not parsed again (its links were collected then). The caller
+            commits the page with cache_sweep.commit(url) once the links are stored
         
     Returns:
         Set[str]: Set of unique Telegram links found
@@ -274,33 +245,36 @@ def extract_links_with_requests(url: str) -> Set[str]:
         }
         
         # Make the request
-        response = requests.get(url, headers=headers, timeout=20)
+        if cache_sweep:
+            response = cache_sweep.fetch(url, headers=headers, timeout=20)
+            if not response.changed:
+                logger.info(f"Page unchanged since the last check, skipping: {url}")
+                return telegram_links
+        else:
+            response = requests.get(url, headers=headers, timeout=20)
         if response.status_code != 200:
             logger.warning(f"Got status code {response.status_code} from {url}")
             return telegram_links
             
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Get the text content to find @username mentions
-        text_content = soup.get_text()
-        links_from_text = _find_telegram_links_static(text_content)
-        telegram_links.update(links_from_text)
-        
-        # Also extract all href attributes from links
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
+        # Links and mentions anywhere in the page, including attributes and text
+        telegram_links.update(_find_telegram_links_static(response.text))
+
+        # Entity-encoded text (e.g. &#64;channel, t&#46;me/...) only matches once decoded
+        if '&' in response.text:
+            telegram_links.update(_find_telegram_links_static(get_parser().text_content(response.text)))
+
+        # Also normalize the href values, which may be relative or percent-encoded
+        for href in get_parser().link_hrefs(response.text):
             if 't.me' in href or 'telegram.me' in href:
-                telegram_links.add(href)
-            
-        # Extract from the full HTML to catch any links in attributes, etc.
-        links_from_html = _find_telegram_links_static(response.text)
-        telegram_links.update(links_from_html)
+                telegram_links.update(extract_telegram_links(href, include_mentions=False))
         
         logger.info(f"Found {len(telegram_links)} links using requests method from {url}")
     except Exception as e:
         logger.error(f"Error extracting links with requests from {url}: {str(e)}")
         logger.debug(f"Traceback: {traceback.format_exc()}")
+        # The page was not fully processed; don't let the cache report it unchanged next time
+        if cache_sweep:
+            cache_sweep.discard(url)
     
     return telegram_links
 
@@ -315,45 +289,30 @@ def _find_telegram_links_static(content: str) -> Set[str]:
     Returns:
         Set[str]: Set of found Telegram links
     """
-    links = []
-    
-    # Find t.me/joinchat and t.me/+ links (private groups/channels)
-    invite_matches = re.findall(r'https?://(?:www\.)?t(?:elegram)?\.me/(?:joinchat/|\+)([a-zA-Z0-9_-]+)', content)
-    for match in invite_matches:
-        links.append(f"https://t.me/joinchat/{match}")
-    
-    # Find t.me/username links (public channels/groups)
-    username_matches = re.findall(r'https?://(?:www\.)?t(?:elegram)?\.me/([a-zA-Z][a-zA-Z0-9_]{3,})', content)
-    for match in username_matches:
-        # Skip common non-channel usernames
-        if match.lower() not in ['joinchat', 'share', 'home', 'login', 'download', 'features', 
-                               'contact', 'privacy', 'faq', 'blog', 'terms', 'apps', 'premium']:
-            links.append(f"https://t.me/{match}")
-    
-    # Find @username mentions (public channels/groups)
-    at_username_matches = re.findall(r'@([a-zA-Z][a-zA-Z0-9_]{3,})', content)
-    for match in at_username_matches:
-        # Skip if it looks like an email address or common words
-        if '.' not in match and match.lower() not in ['gmail', 'yahoo', 'hotmail', 'outlook', 'mail', 'email']:
-            links.append(f"@{match}")
-    
-    # Remove duplicates and return
-    return set(links)
+    return set(extract_telegram_links(content))
 
 
-def extract_links_from_websites(urls: List[str], scroll_count: int = 5) -> Dict[str, List[str]]:
+def extract_links_from_websites(urls: List[str], scroll_count: int = 5, cache_sweep=None) -> Dict[str, List[str]]:
     """
     Extract Telegram links from a list of websites.
     
     Args:
         urls (List[str]): List of URLs to extract links from
         scroll_count (int): Number of times to scroll each page
+        cache_sweep: Optional HttpCacheSweep for the requests-based path. The caller
+            commits each URL with cache_sweep.commit(url) after storing its links;
+            without one, a sweep is created and committed here
         
     Returns:
         Dict[str, List[str]]: Dictionary mapping from URL to the list of Telegram links found
     """
     results = {}
     
+    # Conditional GETs for the requests-based path; hit rates are reported per sweep
+    own_sweep = cache_sweep is None
+    if own_sweep:
+        cache_sweep = http_cache.sweep("websites")
+    
     # First try using Selenium if available
     if SELENIUM_AVAILABLE:
         try:
@@ -370,27 +329,33 @@ def extract_links_from_websites(urls: List[str], scroll_count: int = 5) -> Dict[
                     logger.error(f"Selenium error extracting from {url}: {str(e)}")
                     # Fallback to requests-based extraction for this URL
                     logger.info(f"Falling back to requests-based extraction for {url}")
-                    links = extract_links_with_requests(url)
+                    links = extract_links_with_requests(url, cache_sweep)
                     results[url] = list(links)
             
             crawler.close()
+            cache_sweep.log_stats()
+            if own_sweep:
+                cache_sweep.commit()
             return results
             
         except Exception as e:
             logger.error(f"Error in Selenium extraction, falling back to requests: {str(e)}")
     
-    # If Selenium is not available or failed, use requests/BeautifulSoup
-    logger.info("Using requests/BeautifulSoup for extraction (fallback method)...")
+    # If Selenium is not available or failed, use requests and the HTML parser
+    logger.info("Using requests for extraction (fallback method)...")
     
     for url in urls:
         try:
-            links = extract_links_with_requests(url)
+            links = extract_links_with_requests(url, cache_sweep)
             results[url] = list(links)
             logger.info(f"Found {len(links)} unique links from {url} with requests")
         except Exception as e:
             logger.error(f"Error extracting links from {url}: {str(e)}")
             results[url] = []
     
+    cache_sweep.log_stats()
+    if own_sweep:
+        cache_sweep.commit()
     return results
 
 
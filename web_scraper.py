@@ -2,6 +2,7 @@ import trafilatura
 import requests
 from bs4 import BeautifulSoup
 import logging
+import link_extraction
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -80,33 +81,8 @@ def extract_telegram_links(content: str) -> list:
         A list of Telegram links found in the content
     """
     try:
-        # Regular HTML parsing with BeautifulSoup
-        soup = BeautifulSoup(content, 'html.parser')
-        links = []
-        
-        # Find all anchor tags
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            # Check if it's a Telegram link
-            if 't.me' in href or 'telegram.me' in href:
-                links.append(href)
-                
-        # If no links found with BeautifulSoup, try with simple string search
-        if not links:
-            import re
-            # Find t.me links
-            t_me_links = re.findall(r'https?://(?:t|telegram)\.me/[^\s<>"\']+', content)
-            links.extend(t_me_links)
-            
-            # Find joinchat links
-            joinchat_links = re.findall(r'https?://(?:t|telegram)\.me/joinchat/[^\s<>"\']+', content)
-            links.extend(joinchat_links)
-            
-            # Find + links (private group links)
-            plus_links = re.findall(r'https?://(?:t|telegram)\.me/\+[^\s<>"\']+', content)
-            links.extend(plus_links)
-            
-        return list(set(links))  # Remove duplicates
+        # One pass over the raw content covers both href attributes and plain text
+        return link_extraction.extract_telegram_links(content, include_mentions=False)
     except Exception as e:
         logger.error(f"Error extracting Telegram links: {str(e)}")
         return []
\ No newline at end of file